@@ -0,0 +1,178 @@
+import gzip
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser, SUPPRESS
+
+import requests
+
+import blockchain as blockchain_module
+import compression
+from blockchain import Blockchain
+
+# Codificações comparadas: o valor do Accept-Encoding enviado em cada rodada
+ENCODINGS = ['identity', 'gzip', 'zstd']
+
+
+def build_chain(blocks, transactions_per_block, accounts=20):
+    """
+    Minera uma cadeia válida com transações aleatórias. Use uma dificuldade baixa
+    (Blockchain.difficulty) para que milhares de blocos sejam gerados em segundos.
+    """
+    names = [f'conta{i}' for i in range(accounts)]
+    chain = Blockchain(checkpoint_interval=blocks + 1)
+    for _ in range(blocks - 1):
+        for _ in range(transactions_per_block):
+            sender, recipient = random.sample(names, 2)
+            chain.new_transaction(sender, recipient, random.randint(1, 100))
+        last_block = chain.last_block
+        proof = chain.proof_of_work(last_block)
+        chain.new_transaction(sender='0', recipient='minerador', amount=1)
+        chain.new_block(proof, chain.hash(last_block))
+    return chain.chain
+
+
+def serve(port, chain_file, difficulty):
+    """Sobe um nó servindo a cadeia do arquivo, sem registrar no servidor de nós."""
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    Blockchain.difficulty = difficulty
+    with open(chain_file) as file:
+        blockchain_module.blockchain.chain = json.load(file)
+    blockchain_module.app.run(host='localhost', port=port, threaded=True)
+
+
+def start_nodes(ports, chain_file, difficulty):
+    processes = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port),
+                          '--chain-file', chain_file, '--difficulty', str(difficulty)])
+        for port in ports
+    ]
+
+    # Aguarda todos os nós responderem
+    for port in ports:
+        for _ in range(100):
+            try:
+                requests.get(f'http://localhost:{port}/chain/tip', timeout=1)
+                break
+            except requests.exceptions.RequestException:
+                time.sleep(0.2)
+        else:
+            raise RuntimeError(f'O nó da porta {port} não iniciou')
+
+    return processes
+
+
+def wire_bytes(url, encoding, params=None):
+    """Retorna (bytes trafegados, bytes do JSON) de um GET com o Accept-Encoding informado."""
+    response = requests.get(url, params=params, headers={'Accept-Encoding': encoding}, stream=True)
+    raw = response.raw.read(decode_content=False)
+    content_encoding = response.headers.get('Content-Encoding')
+    if content_encoding == 'gzip':
+        body = gzip.decompress(raw)
+    elif content_encoding == 'zstd':
+        body = compression.zstandard.ZstdDecompressor().decompress(raw, max_output_size=1 << 30)
+    else:
+        body = raw
+    return len(raw), len(body)
+
+
+def measure_resolve(nodes, encoding, legacy=False):
+    """
+    Mede o tempo e os bytes trafegados para um nó novo alcançar a rede.
+
+    :param legacy: Simula o algoritmo anterior, que baixava /chain inteira de cada vizinho
+    :return: (segundos, bytes trafegados)
+    """
+    received = [0]
+    lock = threading.Lock()
+
+    # As respostas chegam em paralelo (uma thread por vizinho): a soma precisa de lock
+    def count_bytes(response, *args, **kwargs):
+        length = response.headers.get('Content-Length')
+        size = int(length) if length is not None else len(response.content)
+        with lock:
+            received[0] += size
+
+    local = Blockchain(checkpoint_interval=10 ** 9)
+    local.nodes = set(nodes)
+    local.sync.session.headers['Accept-Encoding'] = encoding
+    local.sync.session.hooks['response'].append(count_bytes)
+
+    start = time.perf_counter()
+    if legacy:
+        for node in nodes:
+            chain = local.sync.session.get(f'{node}/chain').json()['chain']
+            local.valid_chain(chain)
+    else:
+        local.resolve_conflicts()
+    elapsed = time.perf_counter() - start
+
+    return elapsed, received[0]
+
+
+def main():
+    parser = ArgumentParser(description='Benchmark de bytes trafegados e tempo de resolve com compressão')
+    parser.add_argument('--blocks', default=10000, type=int, help='tamanho da cadeia')
+    parser.add_argument('--nodes', default=10, type=int, help='quantidade de nós')
+    parser.add_argument('--transactions-per-block', default=5, type=int)
+    parser.add_argument('--difficulty', default=1, type=int, help='zeros exigidos na prova de trabalho')
+    parser.add_argument('--base-port', default=5400, type=int)
+    parser.add_argument('--serve', default=None, type=int, help=SUPPRESS)
+    parser.add_argument('--chain-file', default=None, help=SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.chain_file, args.difficulty)
+        return
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    Blockchain.difficulty = args.difficulty
+    encodings = [name for name in ENCODINGS if name != 'zstd' or compression.zstandard is not None]
+
+    print(f'Minerando {args.blocks} blocos (dificuldade {args.difficulty})...')
+    chain = build_chain(args.blocks, args.transactions_per_block)
+
+    with tempfile.TemporaryDirectory() as directory:
+        chain_file = os.path.join(directory, 'chain.json')
+        with open(chain_file, 'w') as file:
+            json.dump(chain, file)
+
+        ports = [args.base_port + i for i in range(args.nodes)]
+        nodes = [f'http://localhost:{port}' for port in ports]
+        processes = start_nodes(ports, chain_file, args.difficulty)
+        try:
+            node = nodes[0]
+            print(f'\nBytes por resposta ({args.blocks} blocos)')
+            print(f"{'endpoint':<32}" + ''.join(f'{name:>14}' for name in encodings))
+            for label, path, params in (
+                    ('/chain', '/chain', None),
+                    ('/chain/headers', '/chain/headers', None),
+                    ('/blocks (100 blocos)', '/blocks', {'start': 1, 'end': 100}),
+                    ('/nodes/resolve', '/nodes/resolve', None),
+                    ('/nodes/resolve?view=summary', '/nodes/resolve', {'view': 'summary'}),
+            ):
+                sizes = [wire_bytes(f'{node}{path}', name, params)[0] for name in encodings]
+                print(f'{label:<32}' + ''.join(f'{size:>14,}' for size in sizes))
+
+            print(f'\nNó novo sincronizando com {args.nodes} nós')
+            print(f"{'modo':<32}{'tempo (s)':>14}{'bytes':>16}")
+            for name in encodings:
+                for legacy in (True, False):
+                    elapsed, received = measure_resolve(nodes, name, legacy)
+                    label = f"{'/chain de todos' if legacy else 'header-first'} ({name})"
+                    print(f'{label:<32}{elapsed:>14.2f}{received:>16,}')
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+
+if __name__ == '__main__':
+    main()
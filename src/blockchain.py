@@ -1,5 +1,6 @@
 import hashlib
 import json
+import os
 from time import time
 from urllib.parse import urlparse
 from uuid import uuid4
@@ -8,13 +9,36 @@ import requests
 from flask import Flask, jsonify, request
 from argparse import ArgumentParser
 
+import compression
+from peers import PeerManager
+from profiling import ProfileStore, SORT_KEYS
+from sync import ChainSync
+
 
 class Blockchain:
-    def __init__(self):
+    # Quantidade de zeros exigidos no início do hash da prova de trabalho
+    difficulty = 4
+
+    def __init__(self, checkpoint_interval=100, max_checkpoints=10, storage_dir=None, checkpoint_confirmations=6):
         self.current_transactions = []
         self.chain = []
         self.nodes = set()
 
+        # Checkpoints: saldos na altura H e hash do bloco H, criados a cada checkpoint_interval blocos
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        # Um bloco só vira checkpoint quando houver essa quantidade de blocos acima dele,
+        # para que dois nós minerando na mesma altura ainda possam convergir
+        self.checkpoint_confirmations = checkpoint_confirmations
+        self.checkpoints = []
+
+        # Diretório onde os corpos dos blocos podados são guardados (None desativa a poda)
+        self.storage_dir = storage_dir
+
+        # Pontuação dos vizinhos e sincronização header-first
+        self.peers = PeerManager()
+        self.sync = ChainSync(self, self.peers)
+
         # Create the genesis block
         self.new_block(previous_hash='1', proof=100)
 
@@ -34,18 +58,32 @@ class Blockchain:
         else:
             raise ValueError('Invalid URL')
 
-    def last_valid_block_index(self, chain):
+    def last_valid_block_index(self, chain, headers_only=False, enforce_checkpoint=True):
         """
         Retorna o índice do último bloco válido na cadeia.
 
         :param chain: A blockchain
+        :param headers_only: Valida apenas os cabeçalhos (encadeamento e prova), usando o hash anunciado
+        :param enforce_checkpoint: Considera inválido o trecho que diverge do nosso último checkpoint
         :return: O índice do último bloco válido
         """
-        last_block = chain[0]
-        current_index = 1
-
-        while current_index < len(chain):
+        # A validação começa no último checkpoint confiável presente na cadeia
+        start = self.trusted_start(chain)
+        last_block = chain[start]
+        current_index = start + 1
+
+        # Checkpoints não são revertidos: uma cadeia que alcança a altura do último checkpoint
+        # com outro bloco nessa posição só é válida até o bloco anterior a ele
+        end = len(chain)
+        if enforce_checkpoint and self.conflicts_with_checkpoint(chain):
+            end = self.latest_checkpoint['index'] - 1
+
+        while current_index < end:
             block = chain[current_index]
+            # Cabeçalhos (blocos podados) só são aceitos até o checkpoint confiável
+            if self.is_header(block) and not headers_only:
+                return current_index - 1
+
             # Verifica se o bloco é válido
             last_block_hash = self.hash(last_block)
             if block['previous_hash'] != last_block_hash or not self.valid_proof(last_block['proof'], block['proof'],
@@ -55,16 +93,28 @@ class Blockchain:
             last_block = block
             current_index += 1
 
-        return len(chain) - 1  # Retorna o índice do último bloco se toda a cadeia for válida
+        return end - 1  # Retorna o índice do último bloco se toda a cadeia for válida
+
+    def conflicts_with_checkpoint(self, chain):
+        """
+        Verifica se a cadeia alcança a altura do nosso último checkpoint com outro bloco nessa posição.
+
+        :param chain: A blockchain
+        :return: True se a cadeia diverge do checkpoint
+        """
+        checkpoint = self.latest_checkpoint
+        return bool(checkpoint and len(chain) >= checkpoint['index']
+                    and self.hash(chain[checkpoint['index'] - 1]) != checkpoint['hash'])
 
-    def valid_chain(self, chain):
+    def valid_chain(self, chain, headers_only=False):
         """
         Verifica se a blockchain é válida.
 
         :param chain: A blockchain
+        :param headers_only: Valida apenas os cabeçalhos (encadeamento e prova), usando o hash anunciado
         :return: True se a cadeia for válida, False caso contrário
         """
-        last_valid_index = self.last_valid_block_index(chain)
+        last_valid_index = self.last_valid_block_index(chain, headers_only)
         return last_valid_index == len(chain) - 1
 
     def resolve_conflicts(self):
@@ -73,36 +123,79 @@ class Blockchain:
         pela blockchain válida mais longa que contenha o bloco de consenso (hash mais votada e mais recente).
         Caso não haja blockchains válidas externas, utiliza a maior cadeia válida localmente.
 
+        A escolha é feita apenas com os cabeçalhos; depois só os blocos que faltam são baixados.
+
         :return: True se nossa cadeia foi substituída, False caso contrário.
         """
-        neighbours = self.nodes
-        valid_hashes = {}
-        all_chains = [self.chain]  # Adiciona a própria cadeia no início
-
-        # Coleta todas as blockchains dos nós vizinhos
-        for node in neighbours:
-            try:
-                response = requests.get(f'{node}/chain')
-                if response.status_code == 200:
-                    chain = response.json()['chain']
-                    all_chains.append(chain)
-            except Exception as e:
-                print(f"Erro ao conectar com {node}: {e}")
-
-        # Filtra apenas blockchains válidas
-        valid_chains = [chain for chain in all_chains if self.valid_chain(chain)]
+        own_headers = [self.block_header(block) for block in self.chain]
+
+        # Coleta os cabeçalhos das blockchains dos nós vizinhos
+        header_chains = self.sync.fetch_header_chains(self.nodes, own_headers)
+        all_chains = [own_headers] + list(header_chains.values())  # Adiciona a própria cadeia no início
+
+        # Filtra apenas blockchains válidas; vizinhos que enviaram cadeias inválidas são banidos temporariamente.
+        # Uma cadeia válida que só diverge do nosso checkpoint é descartada sem banir o vizinho
+        # Vizinhos com o mesmo topo que o nosso compartilham nossos cabeçalhos, validados uma só vez
+        own_valid = self.valid_chain(own_headers, headers_only=True)
+        valid_chains = [own_headers] if own_valid else []
+        for node, chain in list(header_chains.items()):
+            if chain is own_headers:
+                if own_valid:
+                    valid_chains.append(chain)
+            elif self.valid_chain(chain, headers_only=True):
+                valid_chains.append(chain)
+            else:
+                if not self.conflicts_with_checkpoint(chain) or (
+                        self.last_valid_block_index(chain, True, enforce_checkpoint=False) != len(chain) - 1):
+                    self.peers.ban(node, 'cadeia inválida')
+                del header_chains[node]
 
         if not valid_chains:
             # Nenhuma blockchain válida, escolhe a maior entre as válidas localmente
-            longest_chain = max(all_chains, key=lambda current_chain: self.last_valid_block_index(current_chain))
+            longest_chain = max(all_chains,
+                                key=lambda current_chain: self.last_valid_block_index(current_chain, True))
 
             # Obtém o índice do último bloco válido
-            last_valid_index = self.last_valid_block_index(longest_chain)
+            last_valid_index = self.last_valid_block_index(longest_chain, True)
 
             # Corta a cadeia para incluir apenas os blocos válidos
-            self.chain = longest_chain[:last_valid_index + 1]
+            new_chain = self.sync.build_chain(longest_chain[:last_valid_index + 1], header_chains)
+            if new_chain is None:
+                return False
+
+            return self.replace_chain(new_chain)
+
+        # Tenta as cadeias da melhor para a pior: se os blocos da escolhida não puderem ser baixados
+        # (e.g. cabeçalhos anunciados com hashes inventados), a escolha é refeita sem ela
+        while valid_chains:
+            new_chain = self.choose_chain(valid_chains)
 
-            return True
+            # Verificar se a cadeia deve ser substituída
+            if len(self.chain) == len(new_chain) and self.hash(self.chain[-1]) == self.hash(new_chain[-1]):
+                return False
+
+            # Baixa dos vizinhos apenas os blocos que ainda não temos
+            built_chain = self.sync.build_chain(new_chain, header_chains)
+            if built_chain is not None:
+                return self.replace_chain(built_chain)
+
+            tip = (len(new_chain), self.hash(new_chain[-1]))
+            print(f"Não foi possível obter a cadeia com topo {tip[1]}, escolhendo outra.")
+            valid_chains = [chain for chain in valid_chains if (len(chain), self.hash(chain[-1])) != tip]
+            header_chains = {node: chain for node, chain in header_chains.items()
+                             if (len(chain), self.hash(chain[-1])) != tip}
+
+        return False
+
+    def choose_chain(self, valid_chains):
+        """
+        Escolhe, entre as cadeias válidas, a mais longa que contenha o bloco de consenso
+        (hash mais votada e mais recente).
+
+        :param valid_chains: Cadeias válidas; cada uma conta como um voto
+        :return: A cadeia escolhida
+        """
+        valid_hashes = {}
 
         # Processar apenas blockchains válidas
         for chain in valid_chains:
@@ -130,14 +223,226 @@ class Blockchain:
         ]
 
         # Escolher a blockchain mais longa
-        new_chain = max(consensus_chains, key=lambda current_chain: (len(current_chain), self.hash(current_chain[-1])))
+        return max(consensus_chains, key=lambda current_chain: (len(current_chain), self.hash(current_chain[-1])))
 
-        # Verificar se a cadeia deve ser substituída
-        if len(self.chain) != len(new_chain) or self.hash(self.chain[-1]) != self.hash(new_chain[-1]):
-            self.chain = new_chain
-            return True
+    def trusted_start(self, chain):
+        """
+        Retorna a posição do checkpoint confiável mais recente presente na cadeia.
 
-        return False
+        :param chain: A blockchain
+        :return: A posição do bloco do checkpoint, ou 0 (gênesis) se nenhum checkpoint corresponder
+        """
+        for checkpoint in reversed(self.checkpoints):
+            position = checkpoint['index'] - 1
+            if position < len(chain) and self.hash(chain[position]) == checkpoint['hash']:
+                return position
+        return 0
+
+    @property
+    def latest_checkpoint(self):
+        return self.checkpoints[-1] if self.checkpoints else None
+
+    def build_checkpoint(self, chain, position, checkpoints):
+        """
+        Calcula o checkpoint do bloco da posição informada, aplicando as transações
+        a partir do checkpoint anterior. Blocos podados são lidos do disco.
+
+        :param chain: A blockchain
+        :param position: Posição do bloco na cadeia
+        :param checkpoints: Checkpoints já existentes nessa cadeia
+        :return: O checkpoint
+        :raise ValueError: Se o corpo de algum bloco não estiver disponível
+        """
+        base = next((checkpoint for checkpoint in reversed(checkpoints)
+                     if checkpoint['index'] - 1 < position), None)
+        balances = dict(base['balances']) if base else {}
+        first_position = base['index'] if base else 0
+
+        blocks = [self.load_block(block) for block in chain[first_position:position + 1]]
+        if any(block is None for block in blocks):
+            raise ValueError(f'Corpo de bloco indisponível para o checkpoint do bloco {position + 1}')
+        self.apply_transactions(balances, blocks)
+
+        return {
+            'index': chain[position]['index'],
+            'hash': self.hash(chain[position]),
+            'balances': balances,
+        }
+
+    def create_checkpoint(self, position):
+        """
+        Cria um checkpoint no bloco da posição informada da nossa cadeia.
+
+        :param position: Posição do bloco na cadeia
+        :return: O checkpoint criado
+        """
+        checkpoint = self.build_checkpoint(self.chain, position, self.checkpoints)
+        self.checkpoints.append(checkpoint)
+        # Mantém apenas os checkpoints mais recentes
+        del self.checkpoints[:-self.max_checkpoints]
+        return checkpoint
+
+    def replace_chain(self, chain):
+        """
+        Substitui a nossa cadeia: descarta os checkpoints que não pertencem à nova cadeia,
+        cria os que faltam e poda os blocos antigos. Os checkpoints são calculados antes
+        da troca, de modo que uma falha mantém a cadeia e os checkpoints atuais.
+
+        :param chain: A nova blockchain
+        :return: True se a cadeia foi substituída, False caso contrário
+        """
+        checkpoints = [
+            checkpoint for checkpoint in self.checkpoints
+            if checkpoint['index'] - 1 < len(chain)
+            and self.hash(chain[checkpoint['index'] - 1]) == checkpoint['hash']
+        ]
+
+        last_index = checkpoints[-1]['index'] if checkpoints else 0
+        first_index = (last_index // self.checkpoint_interval + 1) * self.checkpoint_interval
+        try:
+            for index in range(first_index, len(chain) - self.checkpoint_confirmations + 1,
+                               self.checkpoint_interval):
+                checkpoints.append(self.build_checkpoint(chain, index - 1, checkpoints))
+        except ValueError as e:
+            print(f"Cadeia não substituída: {e}")
+            return False
+
+        self.chain = chain
+        # Mantém apenas os checkpoints mais recentes
+        self.checkpoints = checkpoints[-self.max_checkpoints:]
+        self.prune()
+        return True
+
+    def bootstrap_checkpoint(self):
+        """
+        Passa a confiar no checkpoint anunciado pela maioria estrita dos vizinhos que responderam,
+        quando ele está à frente da nossa cadeia, para que um nó novo sincronize a partir dele
+        em vez de validar desde o gênesis.
+
+        :return: O checkpoint adotado, ou None
+        """
+        # Vizinhos banidos ou em backoff não são consultados, e cada consulta tem timeout
+        responses = self.sync.fetch_all(self.nodes, lambda node: self.sync.get_json(node, '/checkpoint'))
+
+        votes = {}
+        for response in responses.values():
+            checkpoint = response.get('checkpoint')
+            if checkpoint:
+                # O voto é o checkpoint inteiro: hash, altura e saldos precisam coincidir
+                key = json.dumps(checkpoint, sort_keys=True)
+                votes.setdefault(key, [0, checkpoint])[0] += 1
+
+        if not votes:
+            return None
+
+        count, checkpoint = max(votes.values(), key=lambda item: item[0])
+        if count * 2 <= len(responses) or checkpoint['index'] <= len(self.chain):
+            return None
+
+        self.checkpoints.append(checkpoint)
+        return checkpoint
+
+    def prune(self):
+        """
+        Move para o disco os corpos dos blocos até o último checkpoint, mantendo
+        em memória apenas os cabeçalhos.
+
+        :return: Quantidade de blocos podados
+        """
+        if self.storage_dir is None or not self.checkpoints:
+            return 0
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+        position = min(self.checkpoints[-1]['index'], len(self.chain)) - 1
+        pruned = 0
+
+        # Os blocos podados formam um prefixo da cadeia: para no primeiro cabeçalho encontrado
+        while position >= 0 and not self.is_header(self.chain[position]):
+            block = self.chain[position]
+            header = self.block_header(block)
+            with open(self.block_path(header['hash']), 'w') as block_file:
+                json.dump(block, block_file)
+            self.chain[position] = header
+            pruned += 1
+            position -= 1
+
+        return pruned
+
+    def block_path(self, block_hash):
+        return os.path.join(self.storage_dir, f'{block_hash}.json')
+
+    def get_block(self, position):
+        """
+        Retorna o bloco completo da posição informada, lendo do disco se ele tiver sido podado.
+
+        :param position: Posição do bloco na cadeia
+        :return: O bloco, ou None se o corpo não estiver disponível
+        """
+        return self.load_block(self.chain[position])
+
+    def load_block(self, block):
+        """
+        Retorna o bloco completo correspondente ao bloco ou cabeçalho informado.
+
+        :param block: Bloco ou cabeçalho de um bloco podado
+        :return: O bloco, ou None se o corpo não estiver disponível
+        """
+        if not self.is_header(block):
+            return block
+
+        if self.storage_dir is None or not os.path.exists(self.block_path(block['hash'])):
+            return None
+
+        with open(self.block_path(block['hash'])) as block_file:
+            return json.load(block_file)
+
+    @staticmethod
+    def block_header(block):
+        """
+        Retorna o cabeçalho de um bloco: os campos do bloco sem as transações, mais o hash do bloco completo.
+
+        :param block: Block
+        """
+        if Blockchain.is_header(block):
+            return block
+
+        return {
+            'index': block['index'],
+            'timestamp': block['timestamp'],
+            'proof': block['proof'],
+            'previous_hash': block['previous_hash'],
+            'hash': Blockchain.hash(block),
+            'transaction_count': len(block['transactions']),
+        }
+
+    @staticmethod
+    def is_header(block):
+        return 'transactions' not in block
+
+    @staticmethod
+    def apply_transactions(balances, blocks):
+        """
+        Aplica as transações dos blocos sobre os saldos. O remetente "0" representa a recompensa de mineração.
+
+        :param balances: <dict> Saldos por endereço, alterado no lugar
+        :param blocks: Blocos completos
+        :return: Os saldos atualizados
+        """
+        for block in blocks:
+            for transaction in block['transactions']:
+                try:
+                    amount = float(transaction['amount'])
+                except (TypeError, ValueError):
+                    # Quantias inválidas não alteram os saldos
+                    continue
+                if amount.is_integer():
+                    amount = int(amount)
+
+                if transaction['sender'] != '0':
+                    balances[transaction['sender']] = balances.get(transaction['sender'], 0) - amount
+                balances[transaction['recipient']] = balances.get(transaction['recipient'], 0) + amount
+
+        return balances
 
     def new_block(self, proof, previous_hash):
         """
@@ -160,6 +465,13 @@ class Blockchain:
         self.current_transactions = []
 
         self.chain.append(block)
+
+        # O checkpoint é criado no bloco que acabou de receber confirmações suficientes
+        position = len(self.chain) - 1 - self.checkpoint_confirmations
+        if position >= 0 and self.chain[position]['index'] % self.checkpoint_interval == 0:
+            self.create_checkpoint(position)
+            self.prune()
+
         return block
 
     def new_transaction(self, sender, recipient, amount):
@@ -191,6 +503,10 @@ class Blockchain:
         :param block: Block
         """
 
+        # Blocos podados guardam apenas o cabeçalho, que já traz o hash do bloco completo
+        if Blockchain.is_header(block):
+            return block.get('hash')
+
         # We must make sure that the Dictionary is Ordered, or we'll have inconsistent hashes
         block_string = json.dumps(block, sort_keys=True).encode()
         return hashlib.sha256(block_string).hexdigest()
@@ -199,7 +515,7 @@ class Blockchain:
         """
         Simple Proof of Work Algorithm:
 
-         - Find a number p' such that hash(pp') contains leading 4 zeroes
+         - Find a number p' such that hash(pp') contains leading zeroes (4 by default, see difficulty)
          - Where p is the previous proof, and p' is the new proof
 
         :param last_block: <dict> last Block
@@ -229,12 +545,15 @@ class Blockchain:
 
         guess = f'{last_proof}{proof}{last_hash}'.encode()
         guess_hash = hashlib.sha256(guess).hexdigest()
-        return guess_hash[:4] == "0000"
+        return guess_hash[:Blockchain.difficulty] == "0" * Blockchain.difficulty
 
 
 # Instantiate the Node
 app = Flask(__name__)
 
+# Respostas com cadeias e blocos são comprimidas (gzip/zstd) quando o cliente aceita
+compression.init_app(app, ['full_chain', 'chain_headers', 'get_blocks', 'get_block', 'resolve'])
+
 # Generate a globally unique address for this node
 node_identifier = str(uuid4()).replace('-', '')
 
@@ -244,8 +563,12 @@ blockchain = Blockchain()
 # The adress where the program receives requests
 my_node_address = None
 
+# Perfis (cProfile) das últimas requisições instrumentadas
+profiles = ProfileStore()
+
 
 @app.route('/mine', methods=['GET'])
+@profiles.profiled('mine')
 def mine():
     # We run the proof of work algorithm to get the next proof...
     last_block = blockchain.last_block
@@ -299,6 +622,48 @@ def full_chain():
     return jsonify(response), 200
 
 
+@app.route('/chain/tip', methods=['GET'])
+def chain_tip():
+    return jsonify({
+        'length': len(blockchain.chain),
+        'hash': blockchain.hash(blockchain.last_block),
+    }), 200
+
+
+@app.route('/chain/headers', methods=['GET'])
+def chain_headers():
+    """
+    Retorna os cabeçalhos da cadeia (sem as transações) entre os índices start e end, inclusive.
+    """
+    start = request.args.get('start', 1, type=int)
+    end = request.args.get('end', len(blockchain.chain), type=int)
+    if start < 1 or end > len(blockchain.chain) or start > end:
+        return "Error: Invalid block range", 400
+
+    headers = [blockchain.block_header(block) for block in blockchain.chain[start - 1:end]]
+    return jsonify({
+        'headers': headers,
+        'length': len(blockchain.chain),
+    }), 200
+
+
+@app.route('/blocks', methods=['GET'])
+def get_blocks():
+    """
+    Retorna os blocos completos entre os índices start e end, inclusive.
+    """
+    start = request.args.get('start', 1, type=int)
+    end = request.args.get('end', len(blockchain.chain), type=int)
+    if start < 1 or end > len(blockchain.chain) or start > end:
+        return "Error: Invalid block range", 400
+
+    blocks = [blockchain.get_block(position) for position in range(start - 1, end)]
+    if any(block is None for block in blocks):
+        return "Error: Block body is not available on this node", 404
+
+    return jsonify({'blocks': blocks}), 200
+
+
 @app.route('/nodes/register', methods=['POST'])
 def register_nodes():
     values = request.get_json()
@@ -318,13 +683,23 @@ def register_nodes():
 
 
 @app.route('/nodes/resolve', methods=['GET'])
+@profiles.profiled('resolve')
 def resolve():
     """
     Resolve conflitos apenas na blockchain atual.
+
+    Com ?view=summary retorna só o resultado e o topo da cadeia, sem a cadeia inteira.
     """
     replaced = blockchain.resolve_conflicts()
 
-    if replaced:
+    if request.args.get('view') == 'summary':
+        response = {
+            'message': 'Our chain was replaced' if replaced else 'Our chain is authoritative',
+            'replaced': replaced,
+            'length': len(blockchain.chain),
+            'hash': blockchain.hash(blockchain.last_block),
+        }
+    elif replaced:
         response = {
             'message': 'Our chain was replaced',
             'new_chain': blockchain.chain
@@ -339,17 +714,26 @@ def resolve():
 
 
 @app.route('/nodes/resolve_net', methods=['GET'])
+@profiles.profiled('resolve_net')
 def resolve_net():
     """
     Resolve conflitos nas blockchains de todos os nós vizinhos,
     sem afetar a blockchain atual.
     """
-    for node in blockchain.nodes:
+    # Nós em backoff ou banidos são ignorados até o fim da espera
+    for node in blockchain.peers.select(blockchain.nodes):
         try:
-            response = requests.get(f'{node}/nodes/resolve')
+            # O corpo não é usado: pede só o resumo em vez da cadeia inteira
+            response = requests.get(f'{node}/nodes/resolve', params={'view': 'summary'},
+                                    timeout=blockchain.sync.timeout)
             if response.status_code == 200:
+                # A duração é a de uma sincronização completa no vizinho, não a latência dele
+                blockchain.peers.record_success(node)
                 print(f"Conflitos resolvidos no nó {node}")
+            else:
+                blockchain.peers.record_failure(node, f'status {response.status_code}')
         except requests.exceptions.RequestException as e:
+            blockchain.peers.record_failure(node, e)
             print(f"Erro ao tentar resolver conflitos no nó {node}: {e}")
 
     response = {
@@ -359,7 +743,16 @@ def resolve_net():
     return jsonify(response), 200
 
 
+@app.route('/nodes/peers', methods=['GET'])
+def peers_state():
+    """
+    Retorna a pontuação, o backoff e o banimento de cada vizinho conhecido.
+    """
+    return jsonify({'peers': blockchain.peers.snapshot()}), 200
+
+
 @app.route('/nodes/new_blockchain', methods=['POST'])
+@profiles.profiled('new_blockchain')
 def new_blockchain():
     """
     Endpoint chamado quando um novo blockchain é anunciado. Busca os nós registrados.
@@ -378,6 +771,67 @@ def new_blockchain():
     }), 200
 
 
+@app.route('/debug/profiles', methods=['GET'])
+def debug_profiles():
+    """
+    Retorna os perfis guardados no buffer circular.
+
+    Parâmetros de query:
+     - format: 'list' (padrão, JSON com o resumo), 'pstats' ou 'collapsed' (para flamegraphs)
+     - endpoint: filtra pelo nome do endpoint (mine, resolve, resolve_net, new_blockchain)
+     - id: seleciona um único perfil
+     - sort/limit: ordenação e quantidade de linhas do formato pstats
+    """
+    output_format = request.args.get('format', 'list')
+    selected = profiles.select(request.args.get('endpoint'), request.args.get('id', type=int))
+
+    if output_format == 'list':
+        return jsonify({
+            'enabled': profiles.enabled,
+            'capacity': profiles.profiles.maxlen,
+            'profiles': [profiles.summary(profile) for profile in selected],
+        }), 200
+
+    if output_format == 'pstats':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in SORT_KEYS:
+            return f"Error: sort must be one of {', '.join(SORT_KEYS)}", 400
+        limit = request.args.get('limit', 40, type=int)
+        body = '\n'.join(profiles.to_pstats(profile, sort, limit) for profile in selected)
+    elif output_format == 'collapsed':
+        body = ''.join(profiles.to_collapsed(profile) for profile in selected)
+    else:
+        return "Error: format must be 'list', 'pstats' or 'collapsed'", 400
+
+    return body, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+
+@app.route('/checkpoint', methods=['GET'])
+def checkpoint():
+    """
+    Retorna o último checkpoint (saldos e hash do bloco), usado por nós novos para sincronizar sem validar desde o gênesis.
+    """
+    return jsonify({
+        'checkpoint': blockchain.latest_checkpoint,
+        'length': len(blockchain.chain),
+    }), 200
+
+
+@app.route('/blocks/<int:index>', methods=['GET'])
+def get_block(index):
+    """
+    Retorna um bloco completo pelo índice, inclusive os podados da memória.
+    """
+    if index < 1 or index > len(blockchain.chain):
+        return "Error: Block not found", 404
+
+    block = blockchain.get_block(index - 1)
+    if block is None:
+        return "Error: Block body is not available on this node", 404
+
+    return jsonify(block), 200
+
+
 def get_nodes(node_address):
     response = requests.get('http://localhost:5260/nodes')
     if response.status_code == 200:
@@ -392,8 +846,16 @@ def get_nodes(node_address):
     return []
 
 
-def main(port):
+def main(port, profile=False, max_profiles=20, data_dir=None, checkpoint_interval=100, checkpoint_confirmations=6):
     global my_node_address
+    # Ativa o profiling de todas as requisições instrumentadas (também é possível por requisição com X-Profile: 1)
+    profiles.configure(enabled=profile, max_profiles=max_profiles)
+
+    # Blocos anteriores ao último checkpoint são movidos para data_dir (se informado)
+    blockchain.storage_dir = data_dir
+    blockchain.checkpoint_interval = checkpoint_interval
+    blockchain.checkpoint_confirmations = checkpoint_confirmations
+
     # Obtém o endereço do nó com base na porta fornecida
     my_node_address = f'http://localhost:{port}'
 
@@ -403,6 +865,8 @@ def main(port):
     # Obtém a lista de nós registrados
     blockchain.nodes = get_nodes(my_node_address)
 
+    # Um nó novo parte do checkpoint anunciado pela maioria dos vizinhos
+    blockchain.bootstrap_checkpoint()
     blockchain.resolve_conflicts()
 
     # Inicia o aplicativo Flask
@@ -412,5 +876,12 @@ def main(port):
 if __name__ == '__main__':
     parser = ArgumentParser()
     parser.add_argument('-p', '--port', default=5000, type=int, help='port to listen on')
+    parser.add_argument('--profile', action='store_true', help='profile mine/resolve/resolve_net/new_blockchain')
+    parser.add_argument('--max-profiles', default=20, type=int, help='number of profiles kept in memory')
+    parser.add_argument('--data-dir', default=None, help='directory for pruned block bodies (disables pruning if omitted)')
+    parser.add_argument('--checkpoint-interval', default=100, type=int, help='blocks between checkpoints')
+    parser.add_argument('--checkpoint-confirmations', default=6, type=int,
+                        help='blocks mined on top of a block before it becomes a checkpoint')
     args = parser.parse_args()
-    main(args.port)
+    main(args.port, args.profile, args.max_profiles, args.data_dir, args.checkpoint_interval,
+         args.checkpoint_confirmations)
@@ -0,0 +1,317 @@
+import csv
+import gzip
+import json
+import math
+import random
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import perf_counter
+
+import requests
+from requests.adapters import HTTPAdapter
+
+NODES_SERVER_URL = "http://localhost:5260"  # URL padrão do servidor de registro de nós
+NODE_URL = "http://localhost:5000"  # URL padrão de um nó blockchain
+
+
+class BlockchainClient:
+    def __init__(self, url, pool_size=16, timeout=60, compress_requests=False):
+        """
+        Cliente HTTP de um nó, com conexões reaproveitadas entre as requisições.
+        As respostas comprimidas (gzip) são descomprimidas automaticamente pelo requests.
+
+        :param url: Endereço do nó. E.g. 'http://localhost:5000'
+        :param pool_size: Quantidade máxima de conexões abertas com o nó
+        :param timeout: Tempo máximo (s) de cada requisição
+        :param compress_requests: Envia os corpos JSON comprimidos com gzip
+        """
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+        self.compress_requests = compress_requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method, path, expected_status=200, **kwargs):
+        if self.compress_requests and 'json' in kwargs:
+            kwargs['data'] = gzip.compress(json.dumps(kwargs.pop('json')).encode())
+            kwargs['headers'] = {**kwargs.get('headers', {}),
+                                 'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+
+        response = self.session.request(method, f'{self.url}{path}', timeout=self.timeout, **kwargs)
+        if response.status_code != expected_status:
+            raise RuntimeError(f'{method} {path} em {self.url} retornou {response.status_code}: {response.text}')
+        return response.json()
+
+    def new_transaction(self, sender, recipient, amount):
+        return self.request('POST', '/transactions/new', 201,
+                            json={'sender': sender, 'recipient': recipient, 'amount': amount})
+
+    def mine(self):
+        return self.request('GET', '/mine')
+
+    def chain(self):
+        return self.request('GET', '/chain')['chain']
+
+    def headers(self):
+        return self.request('GET', '/chain/headers')['headers']
+
+    def resolve(self, summary=False):
+        """Resolve conflitos no nó. Com summary=True retorna só o resultado e o topo, sem a cadeia."""
+        params = {'view': 'summary'} if summary else None
+        return self.request('GET', '/nodes/resolve', params=params)
+
+    def resolve_net(self):
+        return self.request('GET', '/nodes/resolve_net')
+
+    def nodes(self):
+        """Lista os nós registrados (o cliente deve apontar para o servidor de registro)."""
+        return self.request('GET', '/nodes')['nodes']
+
+    def close(self):
+        self.session.close()
+
+
+def read_transactions(stream):
+    """
+    Lê transações de um arquivo, uma por linha, sem carregar o arquivo inteiro.
+    Aceita JSON por linha ({"sender": ..., "recipient": ..., "amount": ...}) ou CSV (sender,recipient,amount).
+
+    :param stream: Arquivo aberto em modo texto
+    :return: Gerador de dicts com sender, recipient e amount
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+
+        if line.startswith('{'):
+            values = json.loads(line)
+        else:
+            fields = next(csv.reader([line]))
+            if len(fields) != 3:
+                raise ValueError(f'Linha {line_number}: esperado sender,recipient,amount')
+            values = dict(zip(('sender', 'recipient', 'amount'), fields))
+
+        if not all(k in values for k in ('sender', 'recipient', 'amount')):
+            raise ValueError(f'Linha {line_number}: faltam campos da transação')
+        yield values
+
+
+def percentile(sorted_values, fraction):
+    """Percentil pelo método do posto mais próximo (sorted_values deve estar ordenado)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_report(latencies):
+    latencies = sorted(latencies)
+    return {
+        'count': len(latencies),
+        'p50': percentile(latencies, 0.50),
+        'p90': percentile(latencies, 0.90),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+    }
+
+
+def timed(function, *args, **kwargs):
+    start = perf_counter()
+    function(*args, **kwargs)
+    return perf_counter() - start
+
+
+def submit_transactions(clients, transactions, concurrency=8, mine_every=None, mine_at_end=False):
+    """
+    Envia as transações aos nós em paralelo, distribuindo-as em rodízio, com no máximo
+    `concurrency` requisições pendentes por nó.
+
+    :param clients: Lista de BlockchainClient
+    :param transactions: Iterável de dicts com sender, recipient e amount
+    :param concurrency: Requisições simultâneas por nó
+    :param mine_every: Se informado, minera em todos os nós a cada N transações enviadas
+    :param mine_at_end: Minera em todos os nós ao final do envio
+
+    A mineração é feita em um nó por vez: cada nó resolve conflitos (adotando o bloco do anterior)
+    antes de minerar, e o último propaga a cadeia com resolve_net. Assim não surgem blocos
+    concorrentes na mesma altura, que seriam descartados no próximo resolve.
+    :return: <dict> Relatório com vazão e percentis de latência
+    """
+    max_in_flight = concurrency * len(clients)
+    transaction_latencies = []
+    mine_latencies = []
+    transaction_errors = []
+    mine_errors = []
+    mined_blocks = []
+    in_flight = set()
+
+    def collect(futures, latencies, errors):
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception as e:
+                errors.append(str(e))
+
+    def mine_all():
+        # Espera as transações pendentes para que entrem no bloco minerado
+        collect(in_flight, transaction_latencies, transaction_errors)
+        in_flight.clear()
+        for client in clients:
+            try:
+                client.resolve(summary=True)
+                mine_start = perf_counter()
+                mined_blocks.append(client.mine())
+                mine_latencies.append(perf_counter() - mine_start)
+            except Exception as e:
+                mine_errors.append(str(e))
+        try:
+            clients[-1].resolve_net()
+        except Exception as e:
+            mine_errors.append(str(e))
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        submitted = 0
+        for transaction in transactions:
+            client = clients[submitted % len(clients)]
+            in_flight.add(executor.submit(timed, client.new_transaction,
+                                          transaction['sender'], transaction['recipient'], transaction['amount']))
+            submitted += 1
+
+            if len(in_flight) >= max_in_flight:
+                done, pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done, transaction_latencies, transaction_errors)
+                in_flight.intersection_update(pending)
+
+            if mine_every and submitted % mine_every == 0:
+                mine_all()
+
+        if mine_at_end and (not mine_every or submitted % mine_every):
+            mine_all()
+
+        collect(in_flight, transaction_latencies, transaction_errors)
+    elapsed = perf_counter() - start
+
+    blocks_kept = None
+    if mined_blocks:
+        try:
+            blocks_kept = count_kept_blocks(clients[0], mined_blocks)
+        except Exception as e:
+            mine_errors.append(str(e))
+
+    return {
+        'submitted': submitted,
+        'succeeded': len(transaction_latencies),
+        'failed': len(transaction_errors),
+        'mining_failed': len(mine_errors),
+        'blocks_mined': len(mined_blocks),
+        'blocks_kept': blocks_kept,
+        'elapsed': elapsed,
+        'throughput': len(transaction_latencies) / elapsed if elapsed else 0.0,
+        'transactions': latency_report(transaction_latencies),
+        'mining': latency_report(mine_latencies),
+        'errors': (transaction_errors + mine_errors)[:10],
+    }
+
+
+def count_kept_blocks(client, blocks):
+    """
+    Conta quantos dos blocos minerados continuam na cadeia do nó depois de resolver os conflitos.
+
+    :param client: BlockchainClient do nó consultado
+    :param blocks: Respostas do /mine (index, proof e previous_hash de cada bloco)
+    """
+    client.resolve(summary=True)
+    headers = client.headers()
+    return sum(
+        1 for block in blocks
+        if block['index'] <= len(headers)
+        and headers[block['index'] - 1]['previous_hash'] == block['previous_hash']
+        and headers[block['index'] - 1]['proof'] == block['proof']
+    )
+
+
+def print_report(report):
+    print(f"Transações enviadas: {report['submitted']} "
+          f"(sucesso: {report['succeeded']}, falha: {report['failed']})")
+    print(f"Tempo total: {report['elapsed']:.3f}s | Vazão: {report['throughput']:.1f} transações/s")
+    if report['blocks_mined']:
+        kept = '?' if report['blocks_kept'] is None else report['blocks_kept']
+        print(f"Blocos minerados: {report['blocks_mined']} (mantidos na cadeia: {kept})")
+    for name, label in (('transactions', 'Latência das transações'), ('mining', 'Latência da mineração')):
+        latencies = report[name]
+        if latencies['count']:
+            print(f"{label} ({latencies['count']}): p50 {latencies['p50'] * 1000:.1f}ms | "
+                  f"p90 {latencies['p90'] * 1000:.1f}ms | p99 {latencies['p99'] * 1000:.1f}ms | "
+                  f"max {latencies['max'] * 1000:.1f}ms")
+    for error in report['errors']:
+        print(f"Erro: {error}")
+
+
+def generate_transactions(count, accounts=10, max_amount=100):
+    """Gera transações aleatórias entre `accounts` contas, no formato JSON por linha."""
+    names = [f'conta{i}' for i in range(accounts)]
+    for _ in range(count):
+        sender, recipient = random.sample(names, 2)
+        yield {'sender': sender, 'recipient': recipient, 'amount': random.randint(1, max_amount)}
+
+
+def main(argv=None):
+    parser = ArgumentParser(description='Cliente de linha de comando da blockchain')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    submit_parser = subparsers.add_parser('submit', help='envia transações de um arquivo (ou - para stdin)')
+    submit_parser.add_argument('file', help='arquivo JSON por linha ou CSV sender,recipient,amount')
+    submit_parser.add_argument('-n', '--node', action='append', help='nó de destino (pode repetir)')
+    submit_parser.add_argument('-c', '--concurrency', default=8, type=int, help='requisições simultâneas por nó')
+    submit_parser.add_argument('--mine-every', default=None, type=int, help='minera a cada N transações')
+    submit_parser.add_argument('--mine', action='store_true', help='minera ao final do envio')
+    submit_parser.add_argument('--gzip', action='store_true', help='envia os corpos das requisições com gzip')
+    submit_parser.add_argument('--json', action='store_true', help='imprime o relatório em JSON')
+
+    mine_parser = subparsers.add_parser('mine', help='minera um bloco')
+    mine_parser.add_argument('-n', '--node', default=NODE_URL)
+
+    chain_parser = subparsers.add_parser('chain', help='imprime a blockchain')
+    chain_parser.add_argument('-n', '--node', default=NODE_URL)
+
+    nodes_parser = subparsers.add_parser('nodes', help='lista os nós registrados')
+    nodes_parser.add_argument('-r', '--registry', default=NODES_SERVER_URL)
+
+    generate_parser = subparsers.add_parser('generate', help='gera transações aleatórias em JSON por linha')
+    generate_parser.add_argument('count', type=int)
+    generate_parser.add_argument('--accounts', default=10, type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'submit':
+        clients = [BlockchainClient(url, pool_size=args.concurrency, compress_requests=args.gzip)
+                   for url in (args.node or [NODE_URL])]
+        stream = sys.stdin if args.file == '-' else open(args.file)
+        try:
+            report = submit_transactions(clients, read_transactions(stream), args.concurrency,
+                                         args.mine_every, args.mine)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print_report(report)
+    elif args.command == 'mine':
+        print(json.dumps(BlockchainClient(args.node).mine(), indent=2))
+    elif args.command == 'chain':
+        print(json.dumps(BlockchainClient(args.node).chain(), indent=2))
+    elif args.command == 'nodes':
+        print('\n'.join(BlockchainClient(args.registry).nodes()))
+    elif args.command == 'generate':
+        for transaction in generate_transactions(args.count, args.accounts):
+            print(json.dumps(transaction))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import gzip
+import zlib
+from io import BytesIO
+
+from flask import request
+
+try:
+    import zstandard
+except ImportError:
+    # zstd é opcional: sem o pacote zstandard só o gzip é negociado
+    zstandard = None
+
+# Erros levantados ao descomprimir dados corrompidos ou que não estão no formato anunciado
+DECOMPRESSION_ERRORS = (OSError, EOFError, zlib.error) + ((zstandard.ZstdError,) if zstandard is not None else ())
+
+
+def supported_encodings():
+    """Codificações aceitas pelo servidor, da preferida para a menos preferida."""
+    return ['zstd', 'gzip'] if zstandard is not None else ['gzip']
+
+
+def compress(data, encoding, level=None):
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level or 3).compress(data)
+    return gzip.compress(data, compresslevel=level or 6)
+
+
+def decompress(data, encoding, max_size):
+    """
+    Descomprime o corpo de uma requisição, recusando resultados maiores que max_size.
+
+    :return: Os dados descomprimidos, ou None se ultrapassarem max_size
+    :raise DECOMPRESSION_ERRORS: Se os dados não estiverem no formato da codificação
+    """
+    if encoding == 'zstd':
+        reader = zstandard.ZstdDecompressor().stream_reader(BytesIO(data))
+    else:
+        reader = gzip.GzipFile(fileobj=BytesIO(data))
+
+    with reader:
+        result = reader.read(max_size + 1)
+    return result if len(result) <= max_size else None
+
+
+def init_app(app, endpoints, min_size=1024, max_request_size=64 * 1024 * 1024):
+    """
+    Ativa a compressão negociada (Accept-Encoding / Content-Encoding) no app Flask.
+
+    :param app: O app Flask
+    :param endpoints: Nomes dos endpoints cujas respostas podem ser comprimidas
+    :param min_size: Respostas menores que isso (em bytes) são enviadas sem compressão
+    :param max_request_size: Tamanho máximo (em bytes) de um corpo de requisição descomprimido
+    """
+    endpoints = set(endpoints)
+
+    @app.before_request
+    def decompress_request():
+        # Corpos enviados com Content-Encoding são descomprimidos antes de chegar na view
+        encoding = request.headers.get('Content-Encoding', 'identity').lower()
+        if encoding == 'identity':
+            return None
+        if encoding not in supported_encodings():
+            return f'Error: Unsupported Content-Encoding {encoding}', 415
+
+        try:
+            data = decompress(request.get_data(cache=False), encoding, max_request_size)
+        except DECOMPRESSION_ERRORS:
+            return f'Error: Request body is not valid {encoding}', 400
+        if data is None:
+            return 'Error: Request body too large', 413
+
+        request.environ['wsgi.input'] = BytesIO(data)
+        request.environ['CONTENT_LENGTH'] = str(len(data))
+        request.environ.pop('HTTP_CONTENT_ENCODING', None)
+        # Descarta o stream já consumido para que a view leia o corpo descomprimido
+        request.__dict__.pop('stream', None)
+        return None
+
+    @app.after_request
+    def compress_response(response):
+        if (request.endpoint not in endpoints or response.status_code != 200
+                or response.direct_passthrough or response.is_streamed
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(supported_encodings())
+        data = response.get_data()
+        if encoding is None or len(data) < min_size:
+            return response
+
+        response.set_data(compress(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,130 @@
+import threading
+from time import time
+
+
+class PeerManager:
+    def __init__(self, base_backoff=1, max_backoff=300, ban_time=600, latency_weight=0.3, default_latency=1.0):
+        """
+        Mantém a latência e a confiabilidade de cada vizinho, aplicando backoff exponencial
+        aos que falham e banimento temporário aos que enviam blocos inválidos.
+
+        :param base_backoff: Espera (s) após a primeira falha; dobra a cada falha seguida
+        :param max_backoff: Espera máxima (s) do backoff
+        :param ban_time: Duração (s) do banimento
+        :param latency_weight: Peso da última medida na média móvel da latência
+        :param default_latency: Latência (s) assumida para vizinhos ainda não medidos
+        """
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.ban_time = ban_time
+        self.latency_weight = latency_weight
+        self.default_latency = default_latency
+        self.peers = {}
+        self.lock = threading.Lock()
+
+    def peer(self, node):
+        if node not in self.peers:
+            self.peers[node] = {
+                'latency': None,
+                'successes': 0,
+                'failures': 0,
+                'consecutive_failures': 0,
+                'backoff_until': 0,
+                'banned_until': 0,
+                'last_error': None,
+            }
+        return self.peers[node]
+
+    def record_success(self, node, latency=None):
+        """
+        Registra uma resposta bem-sucedida e atualiza a média móvel da latência.
+
+        :param node: Endereço do vizinho
+        :param latency: Duração da requisição, em segundos; None quando a duração não reflete
+                        a rede (e.g. a requisição dispara trabalho demorado no vizinho)
+        """
+        with self.lock:
+            peer = self.peer(node)
+            if latency is not None and peer['latency'] is None:
+                peer['latency'] = latency
+            elif latency is not None:
+                peer['latency'] += self.latency_weight * (latency - peer['latency'])
+            peer['successes'] += 1
+            peer['consecutive_failures'] = 0
+            peer['backoff_until'] = 0
+
+    def record_failure(self, node, error):
+        """
+        Registra uma falha (erro de conexão, timeout, resposta inválida) e coloca o vizinho em backoff.
+
+        :param node: Endereço do vizinho
+        :param error: Descrição do erro
+        """
+        with self.lock:
+            peer = self.peer(node)
+            peer['failures'] += 1
+            peer['consecutive_failures'] += 1
+            peer['last_error'] = str(error)
+            backoff = min(self.base_backoff * 2 ** (peer['consecutive_failures'] - 1), self.max_backoff)
+            peer['backoff_until'] = time() + backoff
+
+    def ban(self, node, reason):
+        """
+        Bane temporariamente um vizinho que enviou blocos ou cadeias inválidas.
+
+        :param node: Endereço do vizinho
+        :param reason: Motivo do banimento
+        """
+        with self.lock:
+            peer = self.peer(node)
+            peer['failures'] += 1
+            peer['last_error'] = str(reason)
+            peer['banned_until'] = time() + self.ban_time
+        print(f"Nó {node} banido por {self.ban_time}s: {reason}")
+
+    def is_available(self, node, now=None):
+        now = time() if now is None else now
+        with self.lock:
+            peer = self.peers.get(node)
+            return peer is None or (now >= peer['backoff_until'] and now >= peer['banned_until'])
+
+    def score(self, node):
+        """
+        Retorna o custo esperado de consultar o vizinho (menor é melhor): a latência
+        média ponderada pela taxa de falhas.
+        """
+        with self.lock:
+            peer = self.peers.get(node)
+            if peer is None or peer['latency'] is None:
+                latency = self.default_latency
+            else:
+                latency = peer['latency']
+            if peer is None:
+                return latency
+            return latency * (1 + peer['failures'] / (peer['successes'] + 1))
+
+    def select(self, nodes):
+        """
+        Retorna os vizinhos disponíveis (fora de backoff e não banidos), dos mais rápidos para os mais lentos.
+        """
+        now = time()
+        return sorted((node for node in nodes if self.is_available(node, now)), key=self.score)
+
+    def snapshot(self):
+        """
+        Retorna o estado de todos os vizinhos conhecidos.
+        """
+        now = time()
+        with self.lock:
+            nodes = list(self.peers)
+        states = []
+        for node in nodes:
+            with self.lock:
+                peer = dict(self.peers[node])
+            peer['node'] = node
+            peer['score'] = self.score(node)
+            peer['available'] = self.is_available(node, now)
+            peer['backoff_remaining'] = max(0, peer.pop('backoff_until') - now)
+            peer['ban_remaining'] = max(0, peer.pop('banned_until') - now)
+            states.append(peer)
+        return sorted(states, key=lambda state: state['score'])
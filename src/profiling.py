@@ -0,0 +1,200 @@
+import cProfile
+import io
+import pstats
+import threading
+from collections import deque
+from functools import wraps
+from time import time
+
+from flask import request
+
+# Cabeçalho que ativa o profiling para uma requisição específica
+PROFILE_HEADER = 'X-Profile'
+
+# Ordenações aceitas pelo relatório pstats
+SORT_KEYS = sorted(key.value for key in pstats.SortKey)
+
+# Perfis das tarefas enviadas a pools de threads pela requisição perfilada na thread atual
+_active = threading.local()
+
+
+def profile_task(function):
+    """
+    Envolve uma tarefa que será executada em outra thread (e.g. um ThreadPoolExecutor) para que
+    ela seja perfilada junto com a requisição que a criou. Deve ser chamada na thread da requisição;
+    fora de uma requisição perfilada retorna a própria função.
+
+    :param function: A tarefa
+    :return: A tarefa instrumentada
+    """
+    collector = getattr(_active, 'profilers', None)
+    if collector is None:
+        return function
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # A partir do Python 3.12 o cProfile da requisição já observa todas as threads
+            return function(*args, **kwargs)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profiler.disable()
+            collector.append(profiler)
+
+    return wrapper
+
+
+class ProfileStore:
+    def __init__(self, max_profiles=20):
+        """
+        Guarda os perfis (cProfile) das últimas requisições em um buffer circular.
+
+        :param max_profiles: Quantidade máxima de perfis mantidos em memória
+        """
+        self.enabled = False
+        self.profiles = deque(maxlen=max_profiles)
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    def configure(self, enabled=None, max_profiles=None):
+        """
+        Ativa/desativa o profiling de todas as requisições e redimensiona o buffer.
+
+        :param enabled: True para perfilar todas as requisições instrumentadas
+        :param max_profiles: Novo tamanho do buffer circular
+        """
+        with self.lock:
+            if enabled is not None:
+                self.enabled = enabled
+            if max_profiles is not None:
+                self.profiles = deque(self.profiles, maxlen=max_profiles)
+
+    def should_profile(self):
+        """
+        Verifica se a requisição atual deve ser perfilada (modo global ou cabeçalho X-Profile).
+        """
+        if self.enabled:
+            return True
+        return request.headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes')
+
+    def add(self, endpoint, profiler, duration, task_profilers=()):
+        """
+        Armazena o perfil de uma requisição, descartando o mais antigo se o buffer estiver cheio.
+
+        :param endpoint: Nome do endpoint perfilado
+        :param profiler: <cProfile.Profile> já finalizado
+        :param duration: Tempo total da requisição, em segundos
+        :param task_profilers: Perfis das tarefas executadas em outras threads, somados ao da requisição
+        :return: O id atribuído ao perfil
+        """
+        stats = pstats.Stats(profiler)
+        for task_profiler in task_profilers:
+            stats.add(task_profiler)
+
+        with self.lock:
+            profile_id = self.next_id
+            self.next_id += 1
+            self.profiles.append({
+                'id': profile_id,
+                'endpoint': endpoint,
+                'timestamp': time(),
+                'duration': duration,
+                'tasks': len(task_profilers),
+                'stats': stats,
+            })
+        return profile_id
+
+    def profiled(self, endpoint):
+        """
+        Decorator que executa a view sob o cProfile quando o profiling estiver ativo.
+
+        :param endpoint: Nome usado para identificar o perfil
+        """
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.should_profile():
+                    return view(*args, **kwargs)
+
+                profiler = cProfile.Profile()
+                # Tarefas criadas pela view com profile_task registram seus perfis aqui
+                previous = getattr(_active, 'profilers', None)
+                _active.profilers = task_profilers = []
+                start = time()
+                try:
+                    return profiler.runcall(view, *args, **kwargs)
+                finally:
+                    _active.profilers = previous
+                    self.add(endpoint, profiler, time() - start, list(task_profilers))
+
+            return wrapper
+
+        return decorator
+
+    def select(self, endpoint=None, profile_id=None):
+        """
+        Retorna os perfis armazenados, opcionalmente filtrados por endpoint ou id.
+        """
+        with self.lock:
+            profiles = list(self.profiles)
+        if endpoint is not None:
+            profiles = [profile for profile in profiles if profile['endpoint'] == endpoint]
+        if profile_id is not None:
+            profiles = [profile for profile in profiles if profile['id'] == profile_id]
+        return profiles
+
+    @staticmethod
+    def summary(profile):
+        return {
+            'id': profile['id'],
+            'endpoint': profile['endpoint'],
+            'timestamp': profile['timestamp'],
+            'duration': profile['duration'],
+            'tasks': profile['tasks'],
+        }
+
+    @staticmethod
+    def to_pstats(profile, sort='cumulative', limit=40):
+        """
+        Formata um perfil como o relatório texto do pstats.
+        """
+        stream = io.StringIO()
+        stream.write(f"# profile {profile['id']} {profile['endpoint']} {profile['duration']:.6f}s\n")
+        stats = pstats.Stats(stream=stream)
+        stats.add(profile['stats'])
+        stats.sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
+
+    @staticmethod
+    def to_collapsed(profile):
+        """
+        Formata um perfil no formato "collapsed stack" (uma pilha por linha, seguida do peso),
+        aceito pelo flamegraph.pl e pelo speedscope.
+
+        O cProfile só registra pares chamador -> chamado, então cada pilha tem no máximo
+        dois níveis; o peso é o tempo próprio em microssegundos.
+        """
+
+        def frame_name(func):
+            filename, line, name = func
+            return f'{name} ({filename}:{line})'
+
+        root = profile['endpoint']
+        lines = []
+        for func, (_, _, _, _, callers) in profile['stats'].stats.items():
+            if not callers:
+                total = profile['stats'].stats[func][2]
+                weight = int(total * 1_000_000)
+                if weight:
+                    lines.append(f'{root};{frame_name(func)} {weight}')
+                continue
+            for caller, (_, _, caller_tottime, _) in callers.items():
+                weight = int(caller_tottime * 1_000_000)
+                if weight:
+                    lines.append(f'{root};{frame_name(caller)};{frame_name(func)} {weight}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,251 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from time import time
+
+import requests
+
+from peers import PeerManager
+from profiling import profile_task
+
+
+class InvalidBlocksError(ValueError):
+    """Blocos recebidos de um vizinho que não correspondem aos cabeçalhos anunciados."""
+
+
+class ChainSync:
+    def __init__(self, blockchain, peers=None, range_size=100, max_workers=8, timeout=10, header_window=64):
+        """
+        Sincronização "header-first": busca o topo e os cabeçalhos de todos os vizinhos,
+        escolhe a cadeia e baixa em paralelo só os corpos de blocos que faltam.
+
+        :param blockchain: A Blockchain local
+        :param peers: <PeerManager> Pontuação dos vizinhos; os lentos, em backoff ou banidos são evitados
+        :param range_size: Quantidade de blocos por requisição de download
+        :param max_workers: Quantidade máxima de requisições simultâneas
+        :param timeout: Tempo máximo (s) de uma requisição; faixas que estouram são pedidas a outro nó
+        :param header_window: Quantidade inicial de cabeçalhos pedidos abaixo do nosso topo para achar o ponto em comum
+        """
+        self.blockchain = blockchain
+        self.peers = peers if peers is not None else PeerManager()
+        self.range_size = range_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.header_window = header_window
+        # Sessão compartilhada para reaproveitar as conexões com os vizinhos
+        self.session = requests.Session()
+
+    def get_json(self, node, path, **params):
+        """
+        Faz um GET no vizinho e registra a latência ou a falha no PeerManager.
+        """
+        start = time()
+        try:
+            response = self.session.get(f'{node}{path}', params=params, timeout=self.timeout)
+            response.raise_for_status()
+            result = response.json()
+        except Exception as e:
+            self.peers.record_failure(node, e)
+            raise
+        self.peers.record_success(node, time() - start)
+        return result
+
+    def fetch_all(self, nodes, fetch):
+        """
+        Executa fetch(node) em paralelo para os nós disponíveis, ignorando os que falharem.
+
+        :return: <dict> Resultado por nó
+        """
+        results = {}
+        nodes = self.peers.select(nodes)
+        # Com a requisição perfilada, as tarefas do pool entram no mesmo perfil
+        fetch = profile_task(fetch)
+        if not nodes:
+            return results
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(fetch, node): node for node in nodes}
+            for future, node in futures.items():
+                try:
+                    results[node] = future.result()
+                except Exception as e:
+                    print(f"Erro ao conectar com {node}: {e}")
+
+        return results
+
+    def fetch_header_chains(self, nodes, own_headers):
+        """
+        Busca os cabeçalhos das cadeias dos vizinhos. Vizinhos cujo topo é igual
+        ao nosso não precisam enviar os cabeçalhos: a cadeia deles é a nossa.
+
+        :param nodes: Endereços dos vizinhos
+        :param own_headers: Cabeçalhos da nossa cadeia
+        :return: <dict> Cabeçalhos por nó
+        """
+        own_tip = own_headers[-1]['hash']
+        tips = self.fetch_all(nodes, lambda node: self.get_json(node, '/chain/tip'))
+
+        header_chains = {
+            node: own_headers for node, tip in tips.items()
+            if tip['length'] == len(own_headers) and tip['hash'] == own_tip
+        }
+
+        # Cada vizinho envia os próprios cabeçalhos, para que um nó que mente não afete os demais
+        others = [node for node in tips if node not in header_chains]
+        header_chains.update(self.fetch_all(others, lambda node: self.fetch_headers(node, tips[node], own_headers)))
+
+        return header_chains
+
+    def fetch_headers(self, node, tip, own_headers):
+        """
+        Busca os cabeçalhos do vizinho só a partir do ponto em que a cadeia dele encontra a nossa.
+        Pede primeiro os últimos header_window cabeçalhos abaixo do menor dos dois topos e, enquanto
+        o primeiro recebido não coincidir com o nosso na mesma altura, dobra a janela para trás
+        (no pior caso, até o gênesis).
+
+        :param node: Endereço do vizinho
+        :param tip: <dict> Topo anunciado pelo vizinho (length e hash)
+        :param own_headers: Cabeçalhos da nossa cadeia
+        :return: Os cabeçalhos da cadeia do vizinho: nosso prefixo em comum seguido dos recebidos
+        """
+        top = min(len(own_headers), tip['length'])
+        window = self.header_window
+        while True:
+            start = max(1, top - window + 1)
+            headers = self.get_json(node, '/chain/headers', start=start)['headers']
+            if not headers:
+                raise ValueError('o vizinho não enviou cabeçalhos')
+            if start == 1:
+                return headers
+            if headers[0]['hash'] == own_headers[start - 1]['hash']:
+                return own_headers[:start - 1] + headers
+            window *= 2
+
+    def build_chain(self, headers, header_chains):
+        """
+        Monta a cadeia completa correspondente aos cabeçalhos escolhidos: reaproveita o prefixo
+        em comum com a nossa cadeia, mantém como cabeçalho o trecho coberto por um checkpoint
+        confiável e baixa o restante dos vizinhos.
+
+        :param headers: Cabeçalhos (já validados) da cadeia escolhida
+        :param header_chains: <dict> Cabeçalhos por nó, para saber quem tem cada bloco
+        :return: A nova cadeia, ou None se algum bloco não pôde ser obtido
+        """
+        chain = self.blockchain.chain
+        common = self.common_prefix(chain, headers)
+        trusted = self.blockchain.trusted_start(headers)
+
+        # Do prefixo em comum, só o trecho até o checkpoint confiável da nova cadeia pode ficar
+        # como cabeçalho; depois dele os blocos podados são lidos do disco ou baixados de novo
+        reused = chain[:min(common, trusted + 1)]
+        for block in chain[len(reused):common]:
+            block = self.blockchain.load_block(block)
+            if block is None:
+                break
+            reused.append(block)
+
+        # Os blocos até o checkpoint confiável não precisam ser baixados
+        first = max(len(reused), trusted + 1) if trusted else len(reused)
+
+        blocks = self.download_blocks(headers, first, header_chains)
+        if blocks is None:
+            return None
+
+        return reused + headers[len(reused):first] + blocks
+
+    def common_prefix(self, chain, headers):
+        """
+        Retorna o tamanho do prefixo em comum entre a cadeia e os cabeçalhos. Como cada bloco
+        referencia o hash do anterior, basta uma busca binária pelo último hash igual.
+        """
+        low, high = 0, min(len(chain), len(headers))
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.blockchain.hash(chain[middle - 1]) == headers[middle - 1]['hash']:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+    def download_blocks(self, headers, first, header_chains):
+        """
+        Baixa em paralelo os corpos dos blocos headers[first:], em faixas distribuídas entre
+        os vizinhos que têm esses blocos, preferindo os mais rápidos. Cada faixa é verificada
+        assim que chega; faixas que falham ou estouram o tempo são pedidas a outro vizinho,
+        e quem envia blocos que não correspondem aos cabeçalhos é banido.
+
+        :return: Os blocos baixados, em ordem, ou None se alguma faixa não pôde ser obtida
+        """
+        ranges = [(start, min(start + self.range_size, len(headers)))
+                  for start in range(first, len(headers), self.range_size)]
+        downloaded = {}
+        tried = {block_range: set() for block_range in ranges}
+        in_flight = {node: 0 for node in header_chains}
+        # Com a requisição perfilada, os downloads nas threads do pool entram no mesmo perfil
+        fetch_range = profile_task(self.fetch_range)
+
+        def holders(block_range):
+            # Quem tem o último bloco da faixa tem também todos os anteriores
+            position = block_range[1] - 1
+            return [node for node, chain in header_chains.items()
+                    if position < len(chain) and chain[position]['hash'] == headers[position]['hash']]
+
+        def next_peer(block_range):
+            candidates = [node for node in self.peers.select(holders(block_range)) if node not in tried[block_range]]
+            if not candidates:
+                return None
+            # Distribui as faixas pelo tempo esperado de espera: latência x faixas já pedidas ao nó
+            return min(candidates, key=lambda node: (in_flight[node] + 1) * self.peers.score(node))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {}
+
+            def submit(block_range):
+                peer = next_peer(block_range)
+                if peer is None:
+                    return False
+                tried[block_range].add(peer)
+                in_flight[peer] += 1
+                pending[executor.submit(fetch_range, peer, block_range)] = (block_range, peer)
+                return True
+
+            for block_range in ranges:
+                if not submit(block_range):
+                    print(f"Nenhum nó possui os blocos {block_range[0] + 1} a {block_range[1]}")
+                    return None
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    block_range, peer = pending.pop(future)
+                    in_flight[peer] -= 1
+                    try:
+                        blocks = future.result()
+                        self.verify_range(headers, block_range, blocks)
+                        downloaded[block_range] = blocks
+                    except InvalidBlocksError as e:
+                        self.peers.ban(peer, e)
+                    except Exception as e:
+                        print(f"Erro ao baixar os blocos {block_range[0] + 1} a {block_range[1]} de {peer}: {e}")
+
+                    if block_range not in downloaded and not submit(block_range):
+                        for other in pending:
+                            other.cancel()
+                        return None
+
+        return [block for block_range in ranges for block in downloaded[block_range]]
+
+    def fetch_range(self, node, block_range):
+        start, end = block_range
+        return self.get_json(node, '/blocks', start=start + 1, end=end)['blocks']
+
+    def verify_range(self, headers, block_range, blocks):
+        """
+        Confere os blocos recebidos com os cabeçalhos já validados: o hash de cada bloco
+        completo deve ser o hash anunciado no cabeçalho.
+        """
+        start, end = block_range
+        if len(blocks) != end - start:
+            raise InvalidBlocksError(f'esperados {end - start} blocos, recebidos {len(blocks)}')
+
+        for position, block in zip(range(start, end), blocks):
+            if self.blockchain.is_header(block) or self.blockchain.hash(block) != headers[position]['hash']:
+                raise InvalidBlocksError(f'bloco {position + 1} não corresponde ao cabeçalho')
@@ -1,3 +1,5 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 import requests
@@ -10,6 +12,68 @@ NODES_ENDPOINT = "/nodes"  # Endpoint para obter a lista de nós
 MINER_ENDPOINT = "/mine"  # Endpoint para iniciar a mineração (corrigido)
 RESOLVE_CONFLICTS_ENDPOINT = "/nodes/resolve"  # Endpoint para resolver conflitos na blockchain
 RESOLVE_NET_ENDPOINT = "/nodes/resolve_net"  # Endpoint para resolver conflitos na rede
+CHAIN_ENDPOINT = "/chain"  # Endpoint para obter a blockchain completa
+CHAIN_TIP_ENDPOINT = "/chain/tip"  # Endpoint para obter o tamanho e o hash do último bloco
+CHAIN_HEADERS_ENDPOINT = "/chain/headers"  # Endpoint para obter os cabeçalhos (com o hash) de uma faixa de blocos
+BLOCKS_ENDPOINT = "/blocks"  # Endpoint para obter uma faixa de blocos
+
+# Intervalo (ms) em que a interface verifica os resultados do worker
+POLL_INTERVAL = 100
+
+
+class BackgroundWorker:
+    def __init__(self, root):
+        """
+        Executa as tarefas de rede em uma thread separada, em ordem de chegada.
+        Os resultados voltam para a thread do Tk por uma fila consultada com root.after,
+        pois os widgets só podem ser alterados pela thread principal.
+        """
+        self.root = root
+        self.tasks = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0
+
+        threading.Thread(target=self.run, daemon=True).start()
+        self.root.after(POLL_INTERVAL, self.poll)
+
+    def submit(self, task, on_success=None, on_error=None, on_progress=None):
+        """
+        Agenda uma tarefa. Ela recebe uma função report(texto) para informar o progresso.
+
+        :param task: Função executada no worker
+        :param on_success: Chamada na thread do Tk com o retorno da tarefa
+        :param on_error: Chamada na thread do Tk com a exceção lançada pela tarefa
+        :param on_progress: Chamada na thread do Tk a cada report(texto)
+        """
+        self.pending += 1
+        self.tasks.put((task, on_success, on_error, on_progress))
+
+    def run(self):
+        while True:
+            task, on_success, on_error, on_progress = self.tasks.get()
+
+            def report(text, callback=on_progress):
+                self.results.put((callback, text))
+
+            try:
+                self.results.put((on_success, task(report)))
+            except Exception as e:
+                self.results.put((on_error, e))
+            self.results.put((self.task_done, None))
+
+    def task_done(self, _):
+        self.pending -= 1
+
+    def poll(self):
+        """Repassa para a thread do Tk os resultados produzidos pelo worker."""
+        try:
+            while True:
+                callback, value = self.results.get_nowait()
+                if callback is not None:
+                    callback(value)
+        except queue.Empty:
+            pass
+        self.root.after(POLL_INTERVAL, self.poll)
 
 
 class BlockchainApp:
@@ -21,6 +85,13 @@ class BlockchainApp:
         self.NODES_SERVER_URL = NODES_SERVER_URL
         self.blockchain_url = None  # Inicializa a variável do nó blockchain como None
 
+        # Blocos já exibidos, como (hash, linhas de transações), para buscar apenas os novos
+        self.shown_blocks = []
+        self.pending_transactions = 0
+
+        # Toda comunicação com a rede acontece no worker, fora da thread do Tk
+        self.worker = BackgroundWorker(self.root)
+
         # Adicionar componentes da interface
         self.create_widgets()
 
@@ -64,22 +135,72 @@ class BlockchainApp:
         self.transaction_button = tk.Button(self.root, text="Enviar Transação", command=self.create_transaction)
         self.transaction_button.grid(row=4, column=1, padx=10, pady=10)
 
+        # Permite enviar várias transações e minerar todas de uma vez
+        self.mine_after_send = tk.BooleanVar(value=True)
+        self.mine_after_check = tk.Checkbutton(self.root, text="Minerar após enviar", variable=self.mine_after_send)
+        self.mine_after_check.grid(row=4, column=0, padx=10, pady=10)
+
+        self.mine_button = tk.Button(self.root, text="Minerar", command=self.start_mining)
+        self.mine_button.grid(row=4, column=2, padx=10, pady=10)
+
         # TextArea para mostrar transações
         self.transactions_text = tk.Text(self.root, width=50, height=10)
         self.transactions_text.grid(row=5, column=0, columnspan=3, padx=10, pady=10)
         self.transactions_text.insert(tk.END, "Transações realizadas:\n")
 
+        # Status e progresso das tarefas em andamento
+        self.status_label = tk.Label(self.root, text="Pronto.", anchor="w")
+        self.status_label.grid(row=6, column=0, columnspan=2, padx=10, pady=10, sticky="we")
+
+        self.progress_bar = ttk.Progressbar(self.root, mode="indeterminate")
+        self.progress_bar.grid(row=6, column=2, padx=10, pady=10)
+
+    def run_task(self, description, task, on_success=None, error_title="Erro"):
+        """
+        Executa uma tarefa de rede no worker, mostrando o status e o progresso enquanto ela roda.
+
+        :param description: Texto exibido no status enquanto a tarefa aguarda/roda
+        :param task: Função executada no worker; recebe report(texto)
+        :param on_success: Chamada na thread do Tk com o retorno da tarefa
+        :param error_title: Prefixo da mensagem de erro
+        """
+
+        def finish():
+            if self.worker.pending <= 1:
+                self.progress_bar.stop()
+                self.set_status("Pronto.")
+
+        def success(result):
+            finish()
+            if on_success:
+                on_success(result)
+
+        def error(e):
+            finish()
+            messagebox.showerror("Erro", f"{error_title}: {e}")
+
+        self.set_status(description)
+        self.progress_bar.start()
+        self.worker.submit(task, success, error, self.set_status)
+
+    def set_status(self, text):
+        pending = f" ({self.pending_transactions} transações pendentes)" if self.pending_transactions else ""
+        self.status_label.config(text=f"{text}{pending}")
+
     def get_nodes(self):
         """Obtém a lista de nós registrados via API."""
-        try:
+
+        def task(report):
             response = requests.get(f'{self.NODES_SERVER_URL}{NODES_ENDPOINT}')
-            if response.status_code == 200:
-                nodes = response.json().get('nodes', [])
-                self.node_combobox['values'] = nodes
-                if nodes:
-                    self.node_combobox.set(nodes[0])  # Seleciona o primeiro nó por padrão
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Erro", f"Erro ao buscar nós: {e}")
+            response.raise_for_status()
+            return response.json().get('nodes', [])
+
+        def show_nodes(nodes):
+            self.node_combobox['values'] = nodes
+            if nodes:
+                self.node_combobox.set(nodes[0])  # Seleciona o primeiro nó por padrão
+
+        self.run_task("Buscando nós...", task, show_nodes, "Erro ao buscar nós")
 
     def connect_to_node(self):
         """Conecta ao nó selecionado e exibe a mensagem de conexão."""
@@ -87,12 +208,14 @@ class BlockchainApp:
         if node_address:
             # Atualiza a URL da blockchain com o nó selecionado
             self.blockchain_url = node_address
+            self.shown_blocks = []
             messagebox.showinfo("Conectado", f"Conectado ao servidor {node_address}")
+            self.show_transaction_in_text()
         else:
             messagebox.showerror("Erro", "Por favor, selecione um nó para conectar.")
 
     def create_transaction(self):
-        """Cria uma nova transação seguindo a ordem correta dos passos."""
+        """Envia a transação no worker e, se marcado, minera em seguida."""
         sender = self.sender_entry.get()
         recipient = self.recipient_entry.get()
         amount = self.amount_entry.get()
@@ -101,105 +224,194 @@ class BlockchainApp:
             messagebox.showerror("Erro", "Todos os campos devem ser preenchidos.")
             return
 
+        if not self.blockchain_url:
+            messagebox.showerror("Erro", "Por favor, conecte-se a um nó.")
+            return
+
         # Enviar transação para a API
         transaction_data = {
             'sender': sender,
             'recipient': recipient,
             'amount': amount
         }
+        url = self.blockchain_url
 
-        try:
-            # Resolver conflitos da blockchain conectada
-            self.resolve_conflicts()
+        def task(report):
+            report("Enviando transação...")
+            response = requests.post(f'{url}{TRANSACTIONS_ENDPOINT}', json=transaction_data)
+            if response.status_code != 201:
+                raise RuntimeError("Erro ao criar transação.")
+            return response.json()
 
-            # Resolver conflitos da rede
-            self.resolve_net()
+        def sent(_):
+            self.pending_transactions += 1
+            self.set_status("Transação enviada.")
 
-            # Criar a transação
-            response = requests.post(f'{self.blockchain_url}{TRANSACTIONS_ENDPOINT}', json=transaction_data)
-            if response.status_code == 201:
-                # Após criar a transação, iniciar a mineração
-                self.start_mining()
-            else:
-                messagebox.showerror("Erro", "Erro ao criar transação.")
-                return
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Erro", f"Erro ao processar a transação: {e}")
-            return
+            # Limpar campos só após o envio ser aceito; em caso de erro os dados continuam na tela
+            self.sender_entry.delete(0, tk.END)
+            self.recipient_entry.delete(0, tk.END)
+            self.amount_entry.delete(0, tk.END)
 
-        # Limpar campos após envio
-        self.sender_entry.delete(0, tk.END)
-        self.recipient_entry.delete(0, tk.END)
-        self.amount_entry.delete(0, tk.END)
+            if self.mine_after_send.get():
+                self.start_mining()
 
-        # Exibir todas as transações após criação
-        self.show_transaction_in_text()
+        self.run_task("Transação na fila...", task, sent, "Erro ao processar a transação")
 
     def start_mining(self):
-        """Chama a API de mineração e resolve conflitos na rede após a mineração."""
-        try:
-            # Chama o endpoint de mineração
-            response = requests.get(f'{self.blockchain_url}{MINER_ENDPOINT}')
-            if response.status_code == 200:
-                # Após minerar, resolver conflitos na rede
-                self.resolve_net()
-            else:
-                messagebox.showerror("Erro", "Erro ao iniciar mineração.")
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Erro", f"Erro ao iniciar mineração: {e}")
-
-    def show_transaction_in_text(self):
-        """Exibe todas as transações da blockchain com sender diferente de 0 na TextArea."""
-        try:
-            response = requests.get(f'{self.blockchain_url}/chain')  # Supondo que o endpoint da blockchain seja /chain
-            if response.status_code == 200:
-                blockchain = response.json()
-                all_transactions = []
-                for block in blockchain.get('chain', []):
-                    all_transactions.extend(block.get('transactions', []))
-
-                # Filtrar transações cujo sender seja diferente de 0
-                filtered_transactions = [
-                    tx for tx in all_transactions if tx.get('sender') != '0'
-                ]
-
-                # Formatar as transações filtradas para exibição
-                formatted_transactions = "\n".join(
-                    [f"Sender: {tx['sender']} | Recipient: {tx['recipient']} | Amount: {tx['amount']}" for tx in
-                     filtered_transactions]
-                )
-
-                self.transactions_text.delete(1.0, tk.END)  # Limpa o TextArea
-                self.transactions_text.insert(tk.END, f"Transações atuais:\n{formatted_transactions}\n")
-            else:
-                messagebox.showerror("Erro", "Erro ao obter a blockchain para exibir transações.")
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Erro", f"Erro ao acessar a blockchain: {e}")
-
-    def resolve_conflicts(self):
-        """Chama a API de resolução de conflitos na blockchain."""
-        try:
-            response = requests.get(f'{self.blockchain_url}{RESOLVE_CONFLICTS_ENDPOINT}')
-            if response.status_code == 200:
-                result = response.json()
-                if 'new_chain' in result:
-                    self.transactions_text.insert(tk.END, "Conflitos resolvidos. A cadeia foi substituída.\n")
-                else:
-                    self.transactions_text.insert(tk.END,
-                                                  "A cadeia está autoritária. Nenhuma substituição foi feita.\n")
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Erro", f"Erro ao resolver conflitos na blockchain: {e}")
-
-    def resolve_net(self):
+        """Resolve conflitos, minera as transações pendentes e propaga o novo bloco para a rede."""
+        if not self.blockchain_url:
+            messagebox.showerror("Erro", "Por favor, conecte-se a um nó.")
+            return
+
+        url = self.blockchain_url
+
+        def task(report):
+            # Resolver conflitos da blockchain conectada e da rede
+            report("Resolvendo conflitos na blockchain...")
+            replaced = self.resolve_conflicts(url)
+            report("Resolvendo conflitos na rede...")
+            self.resolve_net(url)
+
+            report("Minerando...")
+            response = requests.get(f'{url}{MINER_ENDPOINT}')
+            if response.status_code != 200:
+                raise RuntimeError("Erro ao iniciar mineração.")
+            block = response.json()
+
+            # Após minerar, resolver conflitos na rede
+            report("Propagando o bloco para a rede...")
+            self.resolve_net(url)
+            return replaced, block
+
+        def mined(result):
+            replaced, block = result
+            self.pending_transactions = 0
+            self.set_status(f"Bloco {block['index']} minerado.")
+            self.show_transaction_in_text("Conflitos resolvidos. A cadeia foi substituída." if replaced else None)
+
+        self.run_task("Mineração na fila...", task, mined, "Erro ao minerar")
+
+    def show_transaction_in_text(self, message=None):
+        """
+        Exibe as transações com sender diferente de 0, buscando apenas os blocos novos.
+
+        :param message: Mensagem mostrada depois que a atualização terminar
+        """
+        url = self.blockchain_url
+        shown_hashes = [block_hash for block_hash, _ in self.shown_blocks]
+
+        def task(report):
+            report("Atualizando transações...")
+            response = requests.get(f'{url}{CHAIN_TIP_ENDPOINT}')
+            response.raise_for_status()
+            tip = response.json()
+            if shown_hashes and tip['length'] == len(shown_hashes) and tip['hash'] == shown_hashes[-1]:
+                return len(shown_hashes), []
+
+            # Só os blocos depois do ponto em comum com o que já foi exibido são buscados
+            common = self.common_point(url, shown_hashes, tip['length'])
+            if common == tip['length']:
+                return common, []
+            return common, self.fetch_blocks(url, common + 1, tip['length'])
+
+        def show(result):
+            # Outra atualização terminou antes desta: busca de novo a partir do estado atual
+            if [block_hash for block_hash, _ in self.shown_blocks] != shown_hashes:
+                self.show_transaction_in_text(message)
+                return
+
+            common, blocks = result
+            if common < len(self.shown_blocks) or not self.shown_blocks:
+                # Primeira exibição, ou blocos exibidos saíram da cadeia: redesenha até o ponto em comum
+                del self.shown_blocks[common:]
+                self.render_transactions()
+            self.append_blocks(blocks)
+
+            if message:
+                messagebox.showinfo("Blockchain", message)
+
+        self.run_task("Atualização na fila...", task, show, "Erro ao acessar a blockchain")
+
+    @staticmethod
+    def common_point(url, shown_hashes, length, window=16):
+        """
+        Encontra quantos dos blocos exibidos continuam na cadeia do nó, comparando os hashes
+        com os cabeçalhos em janelas cada vez maiores a partir do último bloco exibido.
+
+        :return: A quantidade de blocos em comum
+        """
+        top = min(len(shown_hashes), length)
+        while top:
+            start = max(1, top - window + 1)
+            response = requests.get(f'{url}{CHAIN_HEADERS_ENDPOINT}', params={'start': start, 'end': top})
+            response.raise_for_status()
+            for header in reversed(response.json()['headers']):
+                if header['hash'] == shown_hashes[header['index'] - 1]:
+                    return header['index']
+            top = start - 1
+            window *= 2
+        return 0
+
+    @staticmethod
+    def fetch_blocks(url, start, end):
+        """
+        Busca os blocos de start a end (inclusive) com os respectivos hashes.
+
+        :return: Lista de (hash, bloco)
+        """
+        response = requests.get(f'{url}{CHAIN_HEADERS_ENDPOINT}', params={'start': start, 'end': end})
+        response.raise_for_status()
+        hashes = [header['hash'] for header in response.json()['headers']]
+
+        response = requests.get(f'{url}{BLOCKS_ENDPOINT}', params={'start': start, 'end': end})
+        if response.status_code == 200:
+            blocks = response.json()['blocks']
+        else:
+            # O nó não tem os corpos: só o trecho pedido é lido da cadeia (blocos podados vêm sem transações)
+            response = requests.get(f'{url}{CHAIN_ENDPOINT}')
+            response.raise_for_status()
+            blocks = response.json()['chain'][start - 1:end]
+
+        return list(zip(hashes, blocks))
+
+    def render_transactions(self):
+        """Redesenha a TextArea com as transações dos blocos já exibidos."""
+        self.transactions_text.delete(1.0, tk.END)  # Limpa o TextArea
+        self.transactions_text.insert(tk.END, "Transações atuais:\n")
+        for _, lines in self.shown_blocks:
+            for line in lines:
+                self.transactions_text.insert(tk.END, line)
+
+    def append_blocks(self, blocks):
+        """Acrescenta à TextArea as transações dos blocos informados, como (hash, bloco)."""
+        for block_hash, block in blocks:
+            # Filtrar transações cujo sender seja diferente de 0 (blocos podados não trazem transações)
+            lines = [
+                f"Sender: {tx['sender']} | Recipient: {tx['recipient']} | Amount: {tx['amount']}\n"
+                for tx in block.get('transactions', []) if tx.get('sender') != '0'
+            ]
+            for line in lines:
+                self.transactions_text.insert(tk.END, line)
+            self.shown_blocks.append((block_hash, lines))
+        self.transactions_text.see(tk.END)
+
+    @staticmethod
+    def resolve_conflicts(url):
+        """
+        Chama a API de resolução de conflitos na blockchain.
+
+        :return: True se a cadeia do nó foi substituída
+        """
+        response = requests.get(f'{url}{RESOLVE_CONFLICTS_ENDPOINT}', params={'view': 'summary'})
+        response.raise_for_status()
+        return response.json()['replaced']
+
+    @staticmethod
+    def resolve_net(url):
         """Chama a API de resolução de conflitos na rede."""
-        try:
-            response = requests.get(f'{self.blockchain_url}{RESOLVE_NET_ENDPOINT}')
-            if response.status_code == 200:
-                self.transactions_text.insert(tk.END, "Conflitos resolvidos na rede.\n")
-            else:
-                messagebox.showerror("Erro", "Erro ao resolver conflitos na rede.")
-        except requests.exceptions.RequestException as e:
-            messagebox.showerror("Erro", f"Erro ao resolver conflitos na rede: {e}")
+        response = requests.get(f'{url}{RESOLVE_NET_ENDPOINT}')
+        if response.status_code != 200:
+            raise RuntimeError("Erro ao resolver conflitos na rede.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import os
+import sys
+import threading
+
+import pytest
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+# Os módulos ficam soltos em src/ e importam uns aos outros pelo nome
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from blockchain import Blockchain  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def easy_difficulty():
+    """Prova de trabalho com um zero, para minerar dezenas de blocos em milissegundos."""
+    difficulty = Blockchain.difficulty
+    Blockchain.difficulty = 1
+    yield
+    Blockchain.difficulty = difficulty
+
+
+@pytest.fixture
+def mine():
+    def mine_blocks(blockchain, count, sender='a'):
+        """Minera `count` blocos com uma transação cada na blockchain informada."""
+        for _ in range(count):
+            blockchain.new_transaction(sender, 'b', 1)
+            last_block = blockchain.last_block
+            blockchain.new_block(blockchain.proof_of_work(last_block), blockchain.hash(last_block))
+        return blockchain
+
+    return mine_blocks
+
+
+@pytest.fixture
+def serve():
+    """
+    Sobe vizinhos HTTP de verdade (em threads) que servem uma cadeia pelos endpoints da sincronização.
+    Os cabeçalhos e os blocos enviados podem ser trocados para simular vizinhos que mentem.
+    """
+    servers = []
+
+    def start(chain, headers=None, blocks=None, checkpoint=None):
+        """
+        :param chain: Cadeia servida
+        :param headers: Cabeçalhos enviados em /chain/headers (padrão: os da cadeia)
+        :param blocks: Função (start, end) -> blocos enviados em /blocks (padrão: os da cadeia)
+        :param checkpoint: Checkpoint enviado em /checkpoint
+        :return: Endereço do vizinho
+        """
+        headers = headers if headers is not None else [Blockchain.block_header(block) for block in chain]
+        app = Flask(f'peer{len(servers)}')
+
+        @app.route('/chain/tip')
+        def chain_tip():
+            return jsonify({'length': len(headers), 'hash': headers[-1]['hash']})
+
+        @app.route('/chain/headers')
+        def chain_headers():
+            start_index = request.args.get('start', 1, type=int)
+            return jsonify({'headers': headers[start_index - 1:], 'length': len(headers)})
+
+        @app.route('/checkpoint')
+        def get_checkpoint():
+            return jsonify({'checkpoint': checkpoint, 'length': len(headers)})
+
+        @app.route('/blocks')
+        def get_blocks():
+            start_index = request.args.get('start', type=int)
+            end_index = request.args.get('end', type=int)
+            if blocks is not None:
+                return jsonify({'blocks': blocks(start_index, end_index)})
+            return jsonify({'blocks': chain[start_index - 1:end_index]})
+
+        server = make_server('localhost', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://localhost:{server.server_port}'
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
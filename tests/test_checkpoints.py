@@ -0,0 +1,116 @@
+import copy
+
+from blockchain import Blockchain
+
+
+def pruning_node(tmp_path):
+    return Blockchain(checkpoint_interval=10, checkpoint_confirmations=2, storage_dir=str(tmp_path))
+
+
+def test_fork_across_pruned_checkpoint_is_rejected(tmp_path, mine, serve):
+    local = pruning_node(tmp_path)
+    mine(local, 5)
+    fork = copy.deepcopy(local.chain)
+    mine(local, 6)
+    tip = local.hash(local.last_block)
+    assert [checkpoint['index'] for checkpoint in local.checkpoints] == [10]
+    assert local.is_header(local.chain[0])
+
+    # Cadeia mais longa que se separa da nossa no bloco 6, antes do checkpoint
+    other = Blockchain(checkpoint_interval=1000)
+    other.chain = fork
+    mine(other, 10, sender='fork')
+    assert not local.valid_chain(other.chain)
+
+    peer = serve(other.chain)
+    local.nodes = {peer}
+    assert local.resolve_conflicts() is False
+    assert local.hash(local.last_block) == tip
+    assert [checkpoint['index'] for checkpoint in local.checkpoints] == [10]
+    # A cadeia do vizinho é válida, só diverge do nosso checkpoint: ele não é banido
+    assert local.peers.is_available(peer)
+
+    # A mineração continua criando checkpoints sobre a cadeia podada
+    mine(local, 10)
+    assert [checkpoint['index'] for checkpoint in local.checkpoints] == [10, 20]
+
+
+def test_blocks_mined_at_the_same_height_converge(mine, serve):
+    a = Blockchain(checkpoint_interval=10, checkpoint_confirmations=2)
+    mine(a, 8)
+    b = Blockchain(checkpoint_interval=10, checkpoint_confirmations=2)
+    b.chain = copy.deepcopy(a.chain)
+
+    # Os dois mineram o bloco 10 ao mesmo tempo; B continua até o bloco 15
+    mine(a, 1, sender='a')
+    mine(b, 6, sender='b')
+    assert a.checkpoints == []
+    assert [checkpoint['index'] for checkpoint in b.checkpoints] == [10]
+
+    # A ainda não confirmou o próprio bloco 10 e adota a cadeia mais longa de B
+    a_url = serve(a.chain)
+    a.nodes = {serve(b.chain)}
+    assert a.resolve_conflicts() is True
+    assert a.chain == b.chain
+    assert [checkpoint['index'] for checkpoint in a.checkpoints] == [10]
+    assert a.peers.select(a.nodes) == list(a.nodes)
+
+    # B mantém a própria cadeia sem banir A, cuja cadeia só diverge do checkpoint de B
+    b.nodes = {a_url}
+    assert b.resolve_conflicts() is False
+    assert b.peers.is_available(a_url)
+
+
+def test_reorg_after_checkpoint_loads_pruned_bodies(tmp_path, mine, serve):
+    local = pruning_node(tmp_path)
+    mine(local, 14)
+    fork = [local.get_block(position) for position in range(len(local.chain))]
+    mine(local, 3)
+
+    other = Blockchain(checkpoint_interval=1000)
+    other.chain = copy.deepcopy(fork)
+    mine(other, 15, sender='fork')
+
+    local.nodes = {serve(other.chain)}
+    assert local.resolve_conflicts() is True
+    assert local.hash(local.last_block) == other.hash(other.last_block)
+    assert [checkpoint['index'] for checkpoint in local.checkpoints] == [10, 20]
+    assert local.checkpoints[-1]['balances'] == Blockchain.apply_transactions({}, other.chain[:20])
+    assert [local.get_block(position) for position in range(len(local.chain))] == other.chain
+
+
+def test_replace_chain_without_bodies_keeps_current_chain(tmp_path, mine):
+    local = pruning_node(tmp_path)
+    mine(local, 3)
+    chain = local.chain
+    checkpoints = local.checkpoints
+
+    # Cabeçalhos de outra cadeia: os corpos não estão no disco, o checkpoint 10 não pode ser calculado
+    other = mine(Blockchain(checkpoint_interval=1000), 12, sender='other')
+    headers = [Blockchain.block_header(block) for block in other.chain]
+
+    assert local.replace_chain(headers) is False
+    assert local.chain is chain
+    assert local.checkpoints is checkpoints
+
+
+def test_bootstrap_requires_a_strict_majority(mine, serve):
+    honest = mine(Blockchain(checkpoint_interval=10, checkpoint_confirmations=2), 12)
+    checkpoint = honest.latest_checkpoint
+    fake = dict(checkpoint, index=20, hash='0' * 64)
+
+    # Empate entre o honesto e o mentiroso, que anuncia um checkpoint mais alto: nenhum é adotado
+    node = Blockchain()
+    node.nodes = {serve(honest.chain, checkpoint=checkpoint), serve(honest.chain, checkpoint=fake)}
+    assert node.bootstrap_checkpoint() is None
+    assert node.checkpoints == []
+
+    # Vizinhos banidos não votam
+    banned = serve(honest.chain, checkpoint=checkpoint)
+    node.peers.ban(banned, 'teste')
+    node.nodes.add(banned)
+    assert node.bootstrap_checkpoint() is None
+
+    node.nodes.add(serve(honest.chain, checkpoint=checkpoint))
+    assert node.bootstrap_checkpoint() == checkpoint
+    assert node.checkpoints == [checkpoint]
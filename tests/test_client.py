@@ -0,0 +1,124 @@
+import gzip
+import io
+import json
+
+import pytest
+
+from blockchain_client import BlockchainClient, percentile, read_transactions, submit_transactions
+
+
+def test_read_transactions_accepts_json_and_csv_lines():
+    stream = io.StringIO(
+        '# comentário\n'
+        '\n'
+        '{"sender": "a", "recipient": "b", "amount": 5}\n'
+        'c,"d, e",7\n'
+    )
+
+    assert list(read_transactions(stream)) == [
+        {'sender': 'a', 'recipient': 'b', 'amount': 5},
+        {'sender': 'c', 'recipient': 'd, e', 'amount': '7'},
+    ]
+
+
+@pytest.mark.parametrize('line, message', [
+    ('a,b\n', 'Linha 2: esperado sender,recipient,amount'),
+    ('{"sender": "a", "amount": 1}\n', 'Linha 2: faltam campos da transação'),
+])
+def test_read_transactions_rejects_incomplete_lines(line, message):
+    stream = io.StringIO('a,b,1\n' + line)
+
+    with pytest.raises(ValueError, match=message):
+        list(read_transactions(stream))
+
+
+def test_percentile_uses_nearest_rank():
+    values = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+
+    assert percentile([], 0.5) == 0.0
+    assert percentile(values, 0.5) == 5
+    assert percentile(values, 0.9) == 9
+    assert percentile(values, 0.99) == 10
+    assert percentile([7], 0.0) == 7
+
+
+class FakeClient:
+    """Nó em memória: guarda as transações pendentes e as move para um bloco ao minerar."""
+
+    def __init__(self, fail_every=None):
+        self.pending = []
+        self.blocks = []
+        self.calls = []
+        self.fail_every = fail_every
+        self.received = 0
+
+    def new_transaction(self, sender, recipient, amount):
+        self.received += 1
+        if self.fail_every and self.received % self.fail_every == 0:
+            raise RuntimeError('recusada')
+        self.pending.append((sender, recipient, amount))
+
+    def resolve(self, summary=False):
+        self.calls.append('resolve')
+
+    def mine(self):
+        self.calls.append('mine')
+        self.blocks.append(self.pending)
+        self.pending = []
+        return {'index': len(self.blocks) + 1, 'proof': 0, 'previous_hash': str(len(self.blocks))}
+
+    def resolve_net(self):
+        self.calls.append('resolve_net')
+
+    def headers(self):
+        return [{'index': 1, 'proof': 100, 'previous_hash': '1'}] + [
+            {'index': index, 'proof': 0, 'previous_hash': str(index - 1)} for index in range(2, len(self.blocks) + 2)
+        ]
+
+
+def test_submit_mines_every_n_transactions():
+    client = FakeClient()
+    transactions = [{'sender': 'a', 'recipient': 'b', 'amount': i} for i in range(10)]
+
+    report = submit_transactions([client], transactions, concurrency=2, mine_every=4, mine_at_end=True)
+
+    assert report['submitted'] == report['succeeded'] == 10
+    assert report['failed'] == report['mining_failed'] == 0
+    assert [len(block) for block in client.blocks] == [4, 4, 2]
+    assert client.calls == ['resolve', 'mine', 'resolve_net'] * 3 + ['resolve']
+    assert report['blocks_mined'] == report['blocks_kept'] == 3
+    assert report['mining']['count'] == 3
+
+
+def test_submit_reports_failed_transactions_separately():
+    client = FakeClient(fail_every=3)
+    transactions = [{'sender': 'a', 'recipient': 'b', 'amount': i} for i in range(9)]
+
+    report = submit_transactions([client], transactions, concurrency=1)
+
+    assert report['succeeded'] == 6
+    assert report['failed'] == 3
+    assert report['errors'] == ['recusada'] * 3
+    assert report['blocks_mined'] == 0 and report['blocks_kept'] is None
+
+
+def test_compressed_requests_keep_caller_headers(monkeypatch):
+    client = BlockchainClient('http://localhost:1', compress_requests=True)
+    sent = {}
+
+    class Response:
+        status_code = 201
+
+        @staticmethod
+        def json():
+            return {}
+
+    def request(method, url, timeout=None, **kwargs):
+        sent.update(kwargs)
+        return Response()
+
+    monkeypatch.setattr(client.session, 'request', request)
+    client.request('POST', '/transactions/new', 201, json={'sender': 'a'}, headers={'X-Profile': '1'})
+
+    assert sent['headers'] == {'X-Profile': '1', 'Content-Type': 'application/json', 'Content-Encoding': 'gzip'}
+    assert json.loads(gzip.decompress(sent['data'])) == {'sender': 'a'}
@@ -0,0 +1,71 @@
+import gzip
+import json
+
+import pytest
+
+import blockchain as blockchain_module
+import compression
+from blockchain import Blockchain
+
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+@pytest.fixture
+def client(monkeypatch, mine):
+    # Cadeia grande o bastante para passar do tamanho mínimo de compressão
+    node = mine(Blockchain(), 20)
+    monkeypatch.setattr(blockchain_module, 'blockchain', node)
+    return blockchain_module.app.test_client()
+
+
+def test_gzip_request_body_is_decompressed(client):
+    transaction = {'sender': 'a', 'recipient': 'b', 'amount': 5}
+    response = client.post('/transactions/new', data=gzip.compress(json.dumps(transaction).encode()),
+                           headers={**JSON_HEADERS, 'Content-Encoding': 'gzip'})
+
+    assert response.status_code == 201
+    assert blockchain_module.blockchain.current_transactions == [transaction]
+
+
+def test_gzip_response_round_trip(client):
+    identity = client.get('/chain', headers={'Accept-Encoding': 'identity'})
+    compressed = client.get('/chain', headers={'Accept-Encoding': 'gzip'})
+
+    assert 'Content-Encoding' not in identity.headers
+    assert compressed.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in compressed.headers['Vary']
+    assert len(compressed.data) < len(identity.data)
+    assert json.loads(gzip.decompress(compressed.data)) == identity.get_json()
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get('/chain/headers?start=1&end=1', headers={'Accept-Encoding': 'gzip'})
+
+    assert response.status_code == 200
+    assert 'Content-Encoding' not in response.headers
+
+
+def test_invalid_request_bodies_are_rejected(client):
+    corrupt = client.post('/transactions/new', data=b'not gzip',
+                          headers={**JSON_HEADERS, 'Content-Encoding': 'gzip'})
+    truncated = client.post('/transactions/new', data=gzip.compress(b'{"sender": "a"}')[:-4],
+                            headers={**JSON_HEADERS, 'Content-Encoding': 'gzip'})
+    unsupported = client.post('/transactions/new', data=b'{}',
+                              headers={**JSON_HEADERS, 'Content-Encoding': 'br'})
+
+    assert corrupt.status_code == 400
+    assert truncated.status_code == 400
+    assert unsupported.status_code == 415
+    assert blockchain_module.blockchain.current_transactions == []
+
+
+def test_zstd_round_trip(client):
+    zstandard = pytest.importorskip('zstandard')
+    assert compression.zstandard is not None
+
+    identity = client.get('/chain', headers={'Accept-Encoding': 'identity'})
+    compressed = client.get('/chain', headers={'Accept-Encoding': 'zstd, gzip'})
+
+    assert compressed.headers['Content-Encoding'] == 'zstd'
+    body = zstandard.ZstdDecompressor().decompress(compressed.data, max_output_size=len(identity.data))
+    assert json.loads(body) == identity.get_json()
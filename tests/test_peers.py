@@ -0,0 +1,80 @@
+import copy
+
+import blockchain as blockchain_module
+from blockchain import Blockchain
+
+
+def test_blocks_not_matching_headers_ban_the_sender(mine, serve):
+    local = mine(Blockchain(), 3)
+    remote = Blockchain()
+    remote.chain = copy.deepcopy(local.chain)
+    mine(remote, 5)
+    tip = local.hash(local.last_block)
+
+    # Cabeçalhos corretos, mas os blocos enviados têm as transações trocadas
+    def tampered(start, end):
+        return [dict(block, transactions=[]) for block in remote.chain[start - 1:end]]
+
+    liar = serve(remote.chain, blocks=tampered)
+    local.nodes = {liar}
+    assert local.resolve_conflicts() is False
+    assert local.hash(local.last_block) == tip
+    assert not local.peers.is_available(liar)
+    assert 'não corresponde ao cabeçalho' in local.peers.snapshot()[0]['last_error']
+    assert local.peers.select([liar]) == []
+
+
+def test_invalid_headers_ban_only_their_sender(mine, serve):
+    local = mine(Blockchain(), 2)
+    remote = Blockchain()
+    remote.chain = copy.deepcopy(local.chain)
+    mine(remote, 4)
+
+    # Os dois anunciam o mesmo topo, mas só um envia cabeçalhos que não se encadeiam
+    bad_headers = [Blockchain.block_header(block) for block in remote.chain]
+    bad_headers[-1] = dict(bad_headers[-1], previous_hash='0' * 64)
+    evil = serve(remote.chain, headers=bad_headers)
+    honest = serve(remote.chain)
+
+    local.nodes = {evil, honest}
+    assert local.resolve_conflicts() is True
+    assert local.chain == remote.chain
+    assert not local.peers.is_available(evil)
+    assert local.peers.is_available(honest)
+
+
+def test_failures_back_off_and_success_resets():
+    local = Blockchain()
+    node = 'http://localhost:1'
+    local.peers.record_failure(node, 'timeout')
+    assert not local.peers.is_available(node)
+
+    local.peers.record_success(node, 0.01)
+    assert local.peers.is_available(node)
+    assert local.peers.select([node]) == [node]
+
+
+def test_resolve_net_does_not_count_remote_resolve_as_latency(monkeypatch):
+    node = 'http://localhost:1'
+    local = Blockchain()
+    local.nodes = {node}
+    local.peers.record_success(node, 0.01)
+    monkeypatch.setattr(blockchain_module, 'blockchain', local)
+
+    calls = []
+
+    class Response:
+        status_code = 200
+
+    # A duração do resolve no vizinho é a de uma sincronização completa, não a latência da rede
+    def remote_resolve(url, params=None, timeout=None):
+        calls.append(timeout)
+        return Response()
+
+    monkeypatch.setattr(blockchain_module.requests, 'get', remote_resolve)
+    assert blockchain_module.app.test_client().get('/nodes/resolve_net').status_code == 200
+
+    assert calls == [local.sync.timeout]
+    snapshot, = local.peers.snapshot()
+    assert snapshot['latency'] == 0.01
+    assert snapshot['successes'] == 2
@@ -0,0 +1,87 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+
+import blockchain as blockchain_module
+from profiling import ProfileStore, profile_task
+
+
+def busy_task(count):
+    return sum(range(count))
+
+
+@pytest.fixture
+def store():
+    return ProfileStore(max_profiles=2)
+
+
+@pytest.fixture
+def client(store):
+    app = Flask('profiled')
+
+    @app.route('/work')
+    @store.profiled('work')
+    def work():
+        return str(busy_task(100000))
+
+    @app.route('/pool')
+    @store.profiled('pool')
+    def pool():
+        task = profile_task(busy_task)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return str(sum(executor.map(task, [100000, 200000])))
+
+    return app.test_client()
+
+
+def test_ring_buffer_keeps_latest_profiles(store, client):
+    store.configure(enabled=True)
+    for _ in range(3):
+        assert client.get('/work').status_code == 200
+
+    assert [profile['id'] for profile in store.select()] == [2, 3]
+
+    store.configure(max_profiles=1)
+    assert [profile['id'] for profile in store.select()] == [3]
+
+
+def test_profile_header_enables_a_single_request(store, client):
+    client.get('/work')
+    assert store.select() == []
+
+    client.get('/work', headers={'X-Profile': '1'})
+    client.get('/work')
+    assert [profile['endpoint'] for profile in store.select()] == ['work']
+
+
+def test_pool_tasks_are_merged_into_the_request_profile(store, client):
+    client.get('/pool', headers={'X-Profile': '1'})
+    profile, = store.select()
+
+    assert profile['tasks'] == 2
+    assert ProfileStore.summary(profile)['tasks'] == 2
+    assert any(name == 'busy_task' for _, _, name in profile['stats'].stats)
+
+
+def test_pstats_and_collapsed_output(store, client):
+    client.get('/work', headers={'X-Profile': '1'})
+    profile, = store.select()
+
+    report = ProfileStore.to_pstats(profile, 'calls', 10)
+    assert report.startswith(f"# profile {profile['id']} work ")
+    assert 'busy_task' in report
+
+    lines = ProfileStore.to_collapsed(profile).splitlines()
+    assert lines
+    for line in lines:
+        stack, weight = line.rsplit(' ', 1)
+        assert stack.startswith('work;')
+        assert int(weight) > 0
+
+
+def test_debug_profiles_rejects_unknown_sort():
+    client = blockchain_module.app.test_client()
+
+    assert client.get('/debug/profiles?format=pstats&sort=bogus').status_code == 400
+    assert client.get('/debug/profiles?format=pstats&sort=time').status_code == 200
@@ -0,0 +1,100 @@
+import copy
+import uuid
+
+import blockchain as blockchain_module
+from blockchain import Blockchain
+
+
+def fake_headers(chain, count):
+    """Estende os cabeçalhos da cadeia com `count` cabeçalhos de provas válidas, mas hashes inventados."""
+    headers = [Blockchain.block_header(block) for block in chain]
+    for _ in range(count):
+        last = headers[-1]
+        proof = 0
+        while not Blockchain.valid_proof(last['proof'], proof, last['hash']):
+            proof += 1
+        headers.append({'index': last['index'] + 1, 'timestamp': 0, 'proof': proof,
+                        'previous_hash': last['hash'], 'hash': uuid.uuid4().hex, 'transaction_count': 0})
+    return headers
+
+
+def test_downloads_missing_blocks_in_ranges(mine, serve):
+    local = mine(Blockchain(), 3)
+    remote = Blockchain()
+    remote.chain = copy.deepcopy(local.chain)
+    mine(remote, 250)
+
+    local.sync.range_size = 100
+    local.nodes = {serve(remote.chain), serve(remote.chain)}
+    assert local.resolve_conflicts() is True
+    assert local.chain == remote.chain
+
+
+def header_requests(blockchain):
+    """Registra o parâmetro start de cada /chain/headers pedido pela sincronização."""
+    starts = []
+
+    def record(response, *args, **kwargs):
+        if '/chain/headers' in response.url:
+            starts.append(int(response.url.rsplit('start=', 1)[1]))
+
+    blockchain.sync.session.hooks['response'].append(record)
+    return starts
+
+
+def test_headers_are_fetched_past_the_common_point(mine, serve):
+    local = mine(Blockchain(), 200)
+    remote = Blockchain()
+    remote.chain = copy.deepcopy(local.chain)
+    mine(remote, 50)
+
+    starts = header_requests(local)
+    local.nodes = {serve(remote.chain)}
+    assert local.resolve_conflicts() is True
+    assert local.chain == remote.chain
+    assert starts == [len(local.chain) - 50 - local.sync.header_window + 1]
+
+
+def test_header_window_backs_off_to_a_deep_fork(mine, serve):
+    # Sem checkpoint entre os blocos 21 e 201, que impediria a troca de cadeia
+    local = mine(Blockchain(checkpoint_interval=1000), 20)
+    remote = Blockchain()
+    remote.chain = copy.deepcopy(local.chain)
+    mine(local, 180)
+    mine(remote, 250, sender='fork')
+
+    starts = header_requests(local)
+    local.sync.header_window = 16
+    local.nodes = {serve(remote.chain)}
+    assert local.resolve_conflicts() is True
+    assert local.chain == remote.chain
+    # Janelas de 16, 32, 64, 128 e 256 cabeçalhos abaixo do nosso topo (201), até passar do bloco 21
+    assert starts == [186, 170, 138, 74, 1]
+
+
+def test_undownloadable_chain_falls_back_to_next_best(mine, serve):
+    local = mine(Blockchain(), 3)
+    honest = Blockchain()
+    honest.chain = copy.deepcopy(local.chain)
+    mine(honest, 5)
+
+    # O mentiroso anuncia a cadeia mais longa, mas nenhum corpo corresponde aos cabeçalhos dela
+    liar_headers = fake_headers(local.chain, 20)
+    assert local.valid_chain(liar_headers, headers_only=True)
+    liar = serve(local.chain, headers=liar_headers)
+
+    local.nodes = {liar, serve(honest.chain)}
+    assert local.resolve_conflicts() is True
+    assert local.chain == honest.chain
+
+
+def test_chain_headers_rejects_invalid_range():
+    client = blockchain_module.app.test_client()
+    length = len(blockchain_module.blockchain.chain)
+
+    for query in ('end=-1', 'start=0', f'end={length + 1}', 'start=2&end=1'):
+        assert client.get(f'/chain/headers?{query}').status_code == 400
+
+    response = client.get('/chain/headers?start=1&end=1')
+    assert response.status_code == 200
+    assert [header['index'] for header in response.get_json()['headers']] == [1]